@@ -23,18 +23,39 @@ TEMPLATE_ALIAS = "sandstorm"
 template = (
     Template()
     .from_node_image("24")
-    .apt_install(["curl", "git", "ripgrep", "python3", "python3-pip", "poppler-utils", "qpdf"])
+    # Recommends (compilers, docs, X11 libs) are skipped to keep the image small;
+    # ca-certificates is listed since it usually arrives as a recommend
+    .apt_install(
+        [
+            "ca-certificates",
+            "curl",
+            "git",
+            "ripgrep",
+            "python3",
+            "python3-pip",
+            "poppler-utils",
+            "qpdf",
+        ],
+        no_install_recommends=True,
+    )
     # Pre-install Python packages for document processing skills (pdf, docx, pptx)
-    .run_cmd("pip3 install pypdf==6.7.2 pdfplumber==0.11.9 reportlab==4.4.10 markitdown==0.1.5", user="root")
-    # Install Agent SDK locally so ESM imports resolve correctly
     .run_cmd(
-        "mkdir -p /opt/agent-runner"
-        " && cd /opt/agent-runner"
-        " && npm init -y"
-        f" && npm install @anthropic-ai/claude-agent-sdk@{SDK_VERSION}"
-        " && chmod -R 777 /opt/agent-runner",
+        "pip3 install --no-cache-dir"
+        " pypdf==6.7.2 pdfplumber==0.11.9 reportlab==4.4.10 markitdown==0.1.5",
+        user="root",
+    )
+    # Pre-create Claude's config dir so sandboxes start with it in place
+    .make_dir("/home/user/.claude")
+    # Install Agent SDK locally so ESM imports resolve correctly. Steps run from
+    # least to most frequently changing so the builder's cache reuses the
+    # stable layers on SDK bumps.
+    .run_cmd("mkdir -p /opt/agent-runner && cd /opt/agent-runner && npm init -y", user="root")
+    .run_cmd(
+        "cd /opt/agent-runner && npm install --no-audit --no-fund"
+        f" @anthropic-ai/claude-agent-sdk@{SDK_VERSION}",
         user="root",
     )
+    .run_cmd("chmod -R 777 /opt/agent-runner", user="root")
     # Bake document skills (pdf, docx, pptx) into the template
     .copy(
         ".claude/skills",
@@ -2,7 +2,7 @@
 """Generate the Sandstorm bot icon (512x512 PNG).
 
 Usage:
-    uv run --with Pillow python scripts/generate_icon.py
+    uv run --with Pillow --with numpy python scripts/generate_icon.py
 
 Output: src/sandstorm/assets/sandstorm-icon.png
 """
@@ -10,6 +10,7 @@ Output: src/sandstorm/assets/sandstorm-icon.png
 import math
 from pathlib import Path
 
+import numpy as np
 from PIL import Image, ImageDraw
 
 SIZE = 512
@@ -36,38 +37,37 @@ def draw_swirl_lines(draw: ImageDraw.ImageDraw) -> None:
         amplitude = 30 + i * 12
         width = max(3, 8 - i)
 
-        points: list[tuple[float, float]] = []
         steps = 300
-        for step in range(steps):
-            t = step / steps * math.pi * 3.5  # ~1.75 full rotations
-            r = radius_base + amplitude * math.sin(t * 2.2 + phase)
-            # Spiral outward slightly
-            r += t * 12
-            x = cx + r * math.cos(t + phase * 0.5)
-            y = cy + r * math.sin(t + phase * 0.5)
-            points.append((x, y))
-
-        # Draw as connected line segments
-        for j in range(len(points) - 1):
-            # Fade opacity toward the ends
-            frac = j / len(points)
-            fade = math.sin(frac * math.pi)  # 0 at edges, 1 in middle
-            alpha = int(200 * fade + 55)
-            c = (*color, alpha)
-            draw.line([points[j], points[j + 1]], fill=c, width=width)
+        t = np.arange(steps) / steps * math.pi * 3.5  # ~1.75 full rotations
+        r = radius_base + amplitude * np.sin(t * 2.2 + phase)
+        # Spiral outward slightly
+        r += t * 12
+        xs = cx + r * np.cos(t + phase * 0.5)
+        ys = cy + r * np.sin(t + phase * 0.5)
+        points = list(zip(xs.tolist(), ys.tolist(), strict=True))
+
+        # Fade opacity toward the ends: 0 at edges, 1 in middle
+        fade = np.sin(np.arange(steps - 1) / steps * math.pi)
+        alphas = (200 * fade + 55).astype(int).tolist()
+
+        # Draw as connected line segments (alpha varies per segment, so the
+        # polyline can't be drawn in a single call)
+        for j, alpha in enumerate(alphas):
+            draw.line([points[j], points[j + 1]], fill=(*color, alpha), width=width)
 
 
 def draw_sand_particles(draw: ImageDraw.ImageDraw) -> None:
     """Scatter small dots to give a sandy/dusty feel."""
-    import random
-
-    rng = random.Random(42)  # deterministic
-    for _ in range(120):
-        x = rng.randint(30, SIZE - 30)
-        y = rng.randint(30, SIZE - 30)
-        r = rng.randint(1, 3)
-        alpha = rng.randint(80, 180)
-        color_idx = rng.randint(0, len(SWIRL_COLORS) - 1)
+    count = 120
+    rng = np.random.default_rng(42)  # deterministic
+    xs = rng.integers(30, SIZE - 30, count, endpoint=True)
+    ys = rng.integers(30, SIZE - 30, count, endpoint=True)
+    radii = rng.integers(1, 3, count, endpoint=True)
+    alphas = rng.integers(80, 180, count, endpoint=True)
+    color_idxs = rng.integers(0, len(SWIRL_COLORS), count)
+    for x, y, r, alpha, color_idx in zip(
+        xs.tolist(), ys.tolist(), radii.tolist(), alphas.tolist(), color_idxs.tolist(), strict=True
+    ):
         c = (*SWIRL_COLORS[color_idx], alpha)
         draw.ellipse([x - r, y - r, x + r, y + r], fill=c)
 
@@ -1,17 +1,28 @@
-from importlib.metadata import PackageNotFoundError, version
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from .client import SandstormClient as SandstormClient
     from .main import app as app
 
-try:
-    __version__ = version("duvo-sandstorm")
-except PackageNotFoundError:
-    __version__ = "0.0.0-dev"
+    __version__: str
+
+
+def _resolve_version() -> str:
+    # importlib.metadata is slow to import and scans site-packages, so the
+    # lookup is deferred until __version__ is first read.
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("duvo-sandstorm")
+    except PackageNotFoundError:
+        return "0.0.0-dev"
 
 
 def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        # Cache as a real module global so later reads skip __getattr__
+        value = globals()["__version__"] = _resolve_version()
+        return value
     if name == "app":
         from .main import app
 
@@ -8,8 +8,8 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 MIN_KEY_LENGTH = 32
 
-# Cached keys, populated at startup via load_api_keys()
-_valid_keys: list[str] = []
+# Cached keys (pre-encoded for compare_digest), populated at startup via load_api_keys()
+_valid_keys: tuple[bytes, ...] = ()
 _auth_enabled: bool = False
 
 
@@ -19,7 +19,7 @@ def load_api_keys() -> None:
 
     api_key = os.environ.get("SANDSTORM_API_KEY")
     if not api_key:
-        _valid_keys = []
+        _valid_keys = ()
         _auth_enabled = False
         logging.info("SANDSTORM_API_KEY not set — authentication disabled")
         return
@@ -32,7 +32,7 @@ def load_api_keys() -> None:
     if previous and len(previous) >= MIN_KEY_LENGTH:
         keys.append(previous)
 
-    _valid_keys = keys
+    _valid_keys = tuple(key.encode() for key in keys)
     _auth_enabled = True
     logging.info("Authentication enabled (key length: %d)", len(api_key))
 
@@ -61,7 +61,12 @@ async def verify_api_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    is_valid = any(secrets.compare_digest(credentials.credentials, key) for key in _valid_keys)
+    # Compare against every key (no short-circuit) so timing doesn't reveal which
+    # key matched; bytes also avoid compare_digest's TypeError on non-ASCII str.
+    token = credentials.credentials.encode()
+    is_valid = False
+    for key in _valid_keys:
+        is_valid |= secrets.compare_digest(token, key)
 
     if not is_valid:
         token_prefix = credentials.credentials[:8] if len(credentials.credentials) >= 8 else "***"
@@ -1,24 +1,23 @@
 """CLI interface for Sandstorm — run the server or execute one-off queries."""
 
-import asyncio
 import json
 import logging
 import os
 import re
 import secrets
 import sys
-import urllib.error
-import urllib.request
+from collections.abc import Callable, Coroutine
+from itertools import groupby
 from pathlib import Path
+from typing import Any
 
 import click
+import orjson
 from dotenv import dotenv_values, set_key
-from e2b import AuthenticationException, SandboxException
 
 from sandstorm import _LOG_DATEFMT, _LOG_FORMAT, __version__
 from sandstorm.config import _get_config_path
 from sandstorm.config import load_project_dotenv as load_dotenv
-from sandstorm.e2b_api import E2BApiError, webhook_request
 from sandstorm.starter_catalog import (
     StarterDefinition,
     list_starters,
@@ -48,39 +47,98 @@ class _DefaultQueryGroup(click.Group):
         return super().parse_args(ctx, args)
 
 
+# Assistant content block type -> renderer returning (text, goes_to_stderr)
+_ASSISTANT_BLOCK_RENDERERS: dict[str, Callable[[dict], tuple[str, bool]]] = {
+    "text": lambda block: (block["text"], False),
+    "tool_use": lambda block: (f"[tool: {block.get('name', 'unknown')}]", True),
+}
+
+
+def _print_assistant(event: dict) -> None:
+    rendered = [
+        render(block)
+        for block in event.get("message", {}).get("content", ())
+        if (render := _ASSISTANT_BLOCK_RENDERERS.get(block.get("type"))) is not None
+    ]
+    # One write (and flush) per run of consecutive same-stream blocks, so
+    # fewer writes without reordering text and tool markers on a terminal
+    for to_stderr, run in groupby(rendered, key=lambda part: part[1]):
+        click.echo("".join(text for text, _ in run), nl=False, err=to_stderr)
+
+
+def _print_result(event: dict) -> None:
+    subtype = event.get("subtype", "unknown")
+    num_turns = event.get("num_turns", "?")
+    cost = event.get("cost_usd")
+    cost_str = f"${cost:.4f}" if cost is not None else "n/a"
+    click.echo(
+        f"\n--- Result: {subtype} | turns: {num_turns} | cost: {cost_str} ---",
+        err=True,
+    )
+    structured_output = event.get("structured_output")
+    if structured_output is not None:
+        click.echo(orjson.dumps(structured_output, option=orjson.OPT_INDENT_2).decode())
+
+
+def _print_error(event: dict) -> None:
+    click.echo(f"Error: {event.get('error', 'unknown')}", err=True)
+
+
+# Event type -> printer; other event types are not shown in human-readable mode
+_EVENT_PRINTERS: dict[str, Callable[[dict], None]] = {
+    "assistant": _print_assistant,
+    "result": _print_result,
+    "error": _print_error,
+}
+
+
 def _print_event(line: str) -> None:
     """Parse a JSON event line and print it to the appropriate stream."""
+    # Agent events are always JSON objects; anything else is passed through
+    # without paying for a parse attempt
+    if not line.startswith("{"):
+        click.echo(line, nl=False)
+        return
     try:
-        event = json.loads(line)
-    except json.JSONDecodeError:
+        event = orjson.loads(line)
+    except orjson.JSONDecodeError:
         click.echo(line, nl=False)
         return
 
-    event_type = event.get("type")
-
-    if event_type == "assistant":
-        message = event.get("message", {})
-        for block in message.get("content", []):
-            if block.get("type") == "text":
-                click.echo(block["text"], nl=False)
-            elif block.get("type") == "tool_use":
-                click.echo(f"[tool: {block.get('name', 'unknown')}]", nl=False, err=True)
-
-    elif event_type == "result":
-        subtype = event.get("subtype", "unknown")
-        num_turns = event.get("num_turns", "?")
-        cost = event.get("cost_usd")
-        cost_str = f"${cost:.4f}" if cost is not None else "n/a"
-        click.echo(
-            f"\n--- Result: {subtype} | turns: {num_turns} | cost: {cost_str} ---",
-            err=True,
-        )
-        structured_output = event.get("structured_output")
-        if structured_output is not None:
-            click.echo(json.dumps(structured_output, indent=2))
+    printer = _EVENT_PRINTERS.get(event.get("type"))
+    if printer is not None:
+        printer(event)
+
+
+def _configure_logging() -> None:
+    """Send INFO-level logs to stderr in the shared server/CLI format.
+
+    basicConfig is a no-op once the root logger has handlers, so commands can
+    call this unconditionally.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format=_LOG_FORMAT,
+        datefmt=_LOG_DATEFMT,
+        stream=sys.stderr,
+    )
 
-    elif event_type == "error":
-        click.echo(f"Error: {event.get('error', 'unknown')}", err=True)
+
+def _run_async(coro: Coroutine[Any, Any, None]) -> None:
+    """Run a coroutine on uvloop when installed (POSIX, via uvicorn[standard]).
+
+    uvloop.run only exists in uvloop 0.18+; older installs fall back to asyncio.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    run = getattr(uvloop, "run", None)
+    if run is None:
+        import asyncio
+
+        run = asyncio.run
+    run(coro)
 
 
 def _print_starter_list() -> None:
@@ -421,6 +479,9 @@ def _resolve_toolpack_env_vars(toolpack: ToolpackDefinition) -> dict[str, str]:
 
 _CUSTOM_SLUG_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
 _CUSTOM_ENV_NAME_PATTERN = re.compile(r"^[A-Z_][A-Z0-9_]{0,127}$")
+# Shape checks for pasted Slack tokens, so malformed ones fail before auth.test
+_SLACK_BOT_TOKEN_PATTERN = re.compile(r"^xoxb-[A-Za-z0-9-]{10,}$")
+_SLACK_APP_TOKEN_PATTERN = re.compile(r"^xapp-[A-Za-z0-9-]{10,}$")
 
 
 def _build_custom_toolpack(
@@ -822,12 +883,9 @@ def query(
     """Run a one-off agent query in a sandbox."""
     load_dotenv()
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format=_LOG_FORMAT,
-        datefmt=_LOG_DATEFMT,
-        stream=sys.stderr,
-    )
+    _configure_logging()
+
+    from e2b import AuthenticationException, SandboxException
 
     from .models import QueryRequest
     from .sandbox import run_agent_in_sandbox
@@ -835,9 +893,11 @@ def query(
     files: dict[str, str] | None = None
     if file_paths:
         files = {}
-        cwd = Path.cwd()
+        # click resolves each path to an absolute string, so a prefix test
+        # replaces Path.relative_to's per-file parts walk
+        cwd_prefix = os.path.join(os.getcwd(), "")
         # Match QueryRequest.validate_file_paths: 10 MB per file and 20 files
-        # total. Guarding here avoids a p.read_text() OOM on huge files before
+        # total. Guarding here avoids reading huge files into memory before
         # Pydantic's validator would reject the request.
         _CLI_MAX_FILE_BYTES = 10 * 1024 * 1024
         _CLI_MAX_FILE_COUNT = 20
@@ -848,25 +908,26 @@ def query(
             )
             raise SystemExit(1)
         for fp in file_paths:
-            p = Path(fp)
+            name = os.path.basename(fp)
+            key = fp[len(cwd_prefix) :] if fp.startswith(cwd_prefix) else name
             try:
-                size = p.stat().st_size
+                # Size check and read share one open file descriptor
+                with open(fp, "rb") as fh:
+                    size = os.fstat(fh.fileno()).st_size
+                    if size > _CLI_MAX_FILE_BYTES:
+                        click.echo(
+                            f"Error: {name} is {size:,} bytes (max {_CLI_MAX_FILE_BYTES:,})",
+                            err=True,
+                        )
+                        raise SystemExit(1)
+                    data = fh.read()
             except OSError as exc:
-                click.echo(f"Error: cannot stat {p}: {exc}", err=True)
+                click.echo(f"Error: cannot read {fp}: {exc}", err=True)
                 raise SystemExit(1) from exc
-            if size > _CLI_MAX_FILE_BYTES:
-                click.echo(
-                    f"Error: {p.name} is {size:,} bytes (max {_CLI_MAX_FILE_BYTES:,})",
-                    err=True,
-                )
-                raise SystemExit(1)
             try:
-                rel_path = p.relative_to(cwd)
-            except ValueError:
-                rel_path = Path(p.name)
-            key = str(rel_path)
-            try:
-                files[key] = p.read_text()
+                # Decode the raw bytes as UTF-8: no locale-dependent codec and no
+                # newline-translation pass, so content uploads byte-for-byte
+                files[key] = data.decode("utf-8")
             except UnicodeDecodeError as exc:
                 click.echo(f"Error: {key} is not a text file", err=True)
                 raise SystemExit(1) from exc
@@ -894,7 +955,7 @@ def query(
                 _print_event(line)
 
     try:
-        asyncio.run(_run())
+        _run_async(_run())
     except KeyboardInterrupt as exc:
         click.echo("Interrupted.", err=True)
         raise SystemExit(130) from exc
@@ -914,6 +975,8 @@ def upgrade(yes: bool) -> None:
     """
     import importlib.metadata
     import subprocess
+    import urllib.error
+    import urllib.request
 
     try:
         current = importlib.metadata.version("duvo-sandstorm")
@@ -985,6 +1048,8 @@ def upgrade(yes: bool) -> None:
 def doctor(deep: bool) -> None:
     """Run first-run preflight checks. Prints a colored pass/fail table with fix hints."""
     load_dotenv()
+    import asyncio
+
     from .doctor import print_check_table, run_checks
 
     try:
@@ -1035,12 +1100,9 @@ def replay(
     reproducing a run while a bug fix lands in the toolset.
     """
     load_dotenv()
-    logging.basicConfig(
-        level=logging.INFO,
-        format=_LOG_FORMAT,
-        datefmt=_LOG_DATEFMT,
-        stream=sys.stderr,
-    )
+    _configure_logging()
+
+    from e2b import AuthenticationException, SandboxException
 
     from .models import QueryRequest
     from .sandbox import run_agent_in_sandbox
@@ -1108,7 +1170,7 @@ def replay(
                 replay_model = event.get("model") or replay_model
 
     try:
-        asyncio.run(_run())
+        _run_async(_run())
     except KeyboardInterrupt as exc:
         click.echo("Interrupted.", err=True)
         raise SystemExit(130) from exc
@@ -1153,6 +1215,9 @@ def cancel(run_id: str, server: str, api_key: str | None) -> None:
     Posts to `<server>/runs/<run_id>/cancel`. Returns non-zero when the run
     id is unknown (404) or already finished (409).
     """
+    import urllib.error
+    import urllib.request
+
     load_dotenv()
     token = api_key or os.environ.get("SANDSTORM_API_KEY", "")
     url = server.rstrip("/") + f"/runs/{run_id}/cancel"
@@ -1232,6 +1297,8 @@ def _cli_webhook_request(
     method: str, path: str, api_key: str, data: dict | None = None
 ) -> dict | list | None:
     """CLI wrapper around webhook_request that exits on error."""
+    from .e2b_api import E2BApiError, webhook_request
+
     try:
         return webhook_request(method, path, api_key, data)
     except E2BApiError as exc:
@@ -1240,7 +1307,7 @@ def _cli_webhook_request(
 
 
 def _require_http_url(url: str) -> None:
-    """Reject non-HTTP webhook URLs before making requests with urllib."""
+    """Reject non-HTTP webhook URLs before making any request."""
     if not url.startswith(("http://", "https://")):
         click.echo("Error: URL must use http:// or https://", err=True)
         raise SystemExit(1)
@@ -1345,7 +1412,7 @@ def trigger_test(name: str) -> None:
             _print_event(line)
 
     try:
-        asyncio.run(_run())
+        _run_async(_run())
     except KeyboardInterrupt as exc:
         raise SystemExit(130) from exc
 
@@ -1424,14 +1491,44 @@ def webhook_list(e2b_api_key: str | None) -> None:
 
 
 @webhook.command("delete")
-@click.argument("webhook_id")
+@click.argument("webhook_ids", nargs=-1, required=True)
 @click.option("--e2b-api-key", default=None, help="E2B API key [env: E2B_API_KEY].")
-def webhook_delete(webhook_id: str, e2b_api_key: str | None) -> None:
-    """Delete an E2B webhook by ID."""
+def webhook_delete(webhook_ids: tuple[str, ...], e2b_api_key: str | None) -> None:
+    """Delete one or more E2B webhooks by ID."""
     load_dotenv()
     api_key = _get_e2b_api_key(e2b_api_key)
-    _cli_webhook_request("DELETE", f"/{webhook_id}", api_key)
-    click.echo(f"Webhook {webhook_id} deleted.")
+    if len(webhook_ids) == 1:
+        _cli_webhook_request("DELETE", f"/{webhook_ids[0]}", api_key)
+        click.echo(f"Webhook {webhook_ids[0]} deleted.")
+        return
+
+    import asyncio
+
+    from .e2b_api import E2BApiError, webhook_requests_concurrent
+
+    # Several IDs: overlap the round-trips instead of paying them one by one
+    results = asyncio.run(
+        webhook_requests_concurrent([("DELETE", f"/{wid}") for wid in webhook_ids], api_key)
+    )
+    failed = False
+    for webhook_id, result in zip(webhook_ids, results, strict=True):
+        if isinstance(result, E2BApiError):
+            failed = True
+            click.echo(f"Error deleting {webhook_id}: {result}", err=True)
+        else:
+            click.echo(f"Webhook {webhook_id} deleted.")
+    if failed:
+        raise SystemExit(1)
+
+
+# Constant body for `webhook test`, encoded once and signed as-is
+_WEBHOOK_TEST_PAYLOAD = orjson.dumps(
+    {
+        "type": "sandbox.lifecycle.test",
+        "sandboxId": "test-sandbox-000",
+        "eventData": {"sandbox_metadata": {"request_id": "test0000"}},
+    }
+)
 
 
 @webhook.command("test")
@@ -1447,34 +1544,30 @@ def webhook_test(url: str, secret: str | None) -> None:
     _require_http_url(url)
     secret = secret or os.environ.get("SANDSTORM_WEBHOOK_SECRET", "")
 
-    payload = json.dumps(
-        {
-            "type": "sandbox.lifecycle.test",
-            "sandboxId": "test-sandbox-000",
-            "eventData": {"sandbox_metadata": {"request_id": "test0000"}},
-        }
-    ).encode()
-
     headers = {"Content-Type": "application/json"}
     if secret:
         import hashlib
         import hmac
 
-        sig = hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+        sig = hmac.new(secret.encode(), _WEBHOOK_TEST_PAYLOAD, hashlib.sha256).hexdigest()
         headers["e2b-signature"] = f"sha256={sig}"
 
-    req = urllib.request.Request(url, data=payload, headers=headers, method="POST")
+    import httpx
+
+    from .e2b_api import get_http_client
+
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            body = resp.read().decode(errors="replace")
-            click.echo(f"✓ {resp.status}: {body}")
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode(errors="replace")
-        click.echo(f"✗ {exc.code}: {detail}", err=True)
-        raise SystemExit(1) from exc
-    except urllib.error.URLError as exc:
-        click.echo(f"✗ Unreachable: {exc.reason}", err=True)
+        resp = get_http_client().post(
+            url, content=_WEBHOOK_TEST_PAYLOAD, headers=headers, timeout=10
+        )
+    except httpx.HTTPError as exc:
+        click.echo(f"✗ Unreachable: {exc}", err=True)
         raise SystemExit(1) from exc
+    body = resp.content.decode(errors="replace")
+    if resp.status_code >= 400:
+        click.echo(f"✗ {resp.status_code}: {body}", err=True)
+        raise SystemExit(1)
+    click.echo(f"✓ {resp.status_code}: {body}")
 
 
 # ── Slack bot ─────────────────────────────────────────────────────────────────
@@ -1493,17 +1586,20 @@ def slack_setup() -> None:
 
     load_dotenv()
 
-    # Try multiple locations: package data, CWD
-    candidates = [
-        Path(__file__).resolve().parent / "slack-manifest.yaml",  # package data
-        Path.cwd() / "slack-manifest.yaml",  # CWD
-    ]
-    manifest_path = next((p for p in candidates if p.exists()), None)
-    if manifest_path is None:
-        click.echo("Error: slack-manifest.yaml not found", err=True)
-        raise SystemExit(1)
+    from importlib.resources import files as pkg_files
 
-    manifest_content = manifest_path.read_text()
+    # Package data first (read straight through the package's resource loader),
+    # then a copy in the CWD
+    try:
+        manifest_content = (
+            pkg_files("sandstorm").joinpath("slack-manifest.yaml").read_text(encoding="utf-8")
+        )
+    except FileNotFoundError:
+        try:
+            manifest_content = (Path.cwd() / "slack-manifest.yaml").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            click.echo("Error: slack-manifest.yaml not found", err=True)
+            raise SystemExit(1) from None
 
     click.echo("\n  Sandstorm Slack Bot Setup")
     click.echo("  " + "-" * 25 + "\n")
@@ -1527,13 +1623,13 @@ def slack_setup() -> None:
     click.echo("  Step 2: Copy your tokens\n")
 
     bot_token = click.prompt("  Bot Token (xoxb-...)", type=str).strip()
-    if not bot_token.startswith("xoxb-"):
-        click.echo("Error: Bot token should start with 'xoxb-'", err=True)
+    if not _SLACK_BOT_TOKEN_PATTERN.match(bot_token):
+        click.echo("Error: Bot token should look like 'xoxb-...'", err=True)
         raise SystemExit(1)
 
     app_token = click.prompt("  App Token (xapp-...)", type=str).strip()
-    if not app_token.startswith("xapp-"):
-        click.echo("Error: App token should start with 'xapp-'", err=True)
+    if not _SLACK_APP_TOKEN_PATTERN.match(app_token):
+        click.echo("Error: App token should look like 'xapp-...'", err=True)
         raise SystemExit(1)
 
     # Step 3: Test connectivity
@@ -1630,12 +1726,7 @@ def slack_start(use_http: bool, host: str, port: int) -> None:
     """Start the Slack bot."""
     load_dotenv()
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format=_LOG_FORMAT,
-        datefmt=_LOG_DATEFMT,
-        stream=sys.stderr,
-    )
+    _configure_logging()
 
     if use_http:
         try:
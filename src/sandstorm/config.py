@@ -1,22 +1,23 @@
 """Sandstorm configuration loading, validation, and agent config building."""
 
-import json
 import logging
 import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+import orjson
 from dotenv import dotenv_values
 from dotenv import load_dotenv as _load_dotenv
 
 from .memory import memory_store
-from .models import NAME_PATTERN, QueryRequest
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    # Annotation only: importing models pulls in pydantic, which the CLI's
+    # config/dotenv helpers don't need
+    from .models import QueryRequest
 
-# Regex for valid skill names (re-exported from models for convenience)
-_SKILL_NAME_PATTERN = NAME_PATTERN
+logger = logging.getLogger(__name__)
 
 # Provider env vars auto-forwarded from .env into the sandbox
 _PROVIDER_ENV_KEYS = [
@@ -49,6 +50,8 @@ _MCP_ENV_VAR_PATTERN = re.compile(
     r"\$\{(?P<name>[A-Za-z_][A-Za-z0-9_]*)(?::-(?P<default>[^}]*))?\}"
 )
 _LOADED_DOTENV_VALUES: dict[str, str] = {}
+# Snapshot of non-empty _PROVIDER_ENV_KEYS values; reset whenever .env reloads
+_provider_envs_cache: dict[str, str] | None = None
 _RUNTIME_PROVIDERS = frozenset({"e2b"})
 
 # ── mtime-based config cache ──────────────────────────────────────────────────
@@ -78,7 +81,7 @@ def _read_project_dotenv() -> dict[str, str]:
 
 def load_project_dotenv(*args: Any, **kwargs: Any) -> bool:
     """Load dotenv values and track which project-local keys came from .env."""
-    global _LOADED_DOTENV_VALUES
+    global _LOADED_DOTENV_VALUES, _provider_envs_cache
 
     if not args and "dotenv_path" not in kwargs and "stream" not in kwargs:
         kwargs = {**kwargs, "dotenv_path": _get_env_path()}
@@ -88,6 +91,7 @@ def load_project_dotenv(*args: Any, **kwargs: Any) -> bool:
     override = bool(kwargs.get("override", False))
 
     loaded = _load_dotenv(*args, **kwargs)
+    _provider_envs_cache = None
     _LOADED_DOTENV_VALUES = {
         key: value
         for key, value in current.items()
@@ -103,11 +107,11 @@ def load_project_dotenv(*args: Any, **kwargs: Any) -> bool:
 
 def _refresh_project_dotenv() -> None:
     """Hot-reload project .env values while preserving explicit process env vars."""
-    global _LOADED_DOTENV_VALUES, _env_mtime
+    global _LOADED_DOTENV_VALUES, _env_mtime, _provider_envs_cache
 
     env_path = _get_env_path()
     try:
-        mtime = env_path.stat().st_mtime if env_path.is_file() else 0.0
+        mtime = env_path.stat().st_mtime
     except OSError:
         mtime = 0.0
     if mtime == _env_mtime and mtime != 0.0:
@@ -132,9 +136,26 @@ def _refresh_project_dotenv() -> None:
             os.environ[key] = value
             loaded_values[key] = value
 
+    if loaded_values != previous_loaded:
+        _provider_envs_cache = None
     _LOADED_DOTENV_VALUES = loaded_values
 
 
+def _provider_envs() -> dict[str, str]:
+    """Return the non-empty provider env vars to forward into the sandbox.
+
+    Snapshotted on first use: the process env only changes at runtime through
+    .env (re)loads, which reset the snapshot.
+    """
+    global _provider_envs_cache
+
+    if _provider_envs_cache is None:
+        _provider_envs_cache = {
+            key: value for key in _PROVIDER_ENV_KEYS if (value := os.environ.get(key))
+        }
+    return _provider_envs_cache
+
+
 def _validate_sandstorm_config(raw: dict) -> dict:
     """Validate known sandstorm.json fields, drop invalid ones with warnings."""
     # Expected field types: field_name -> (allowed types tuple, human description)
@@ -272,18 +293,18 @@ def _resolve_mcp_servers(mcp_servers: dict[str, Any] | None) -> dict[str, Any] |
 def load_sandstorm_config() -> dict | None:
     """Load sandstorm.json from the project root if it exists.
 
-    Uses mtime-based caching to avoid re-reading disk on every call.
+    Uses mtime-based caching to avoid re-reading disk on every call. A cache
+    hit costs a single stat() — a missing file is detected from the same call.
     """
     global _config_cache, _config_mtime
 
     config_path = _get_config_path()
-    if not config_path.exists():
+    try:
+        mtime = config_path.stat().st_mtime
+    except FileNotFoundError:
         _config_cache = None
         _config_mtime = 0.0
         return None
-
-    try:
-        mtime = config_path.stat().st_mtime
     except OSError:
         return _config_cache
 
@@ -291,8 +312,8 @@ def load_sandstorm_config() -> dict | None:
         return _config_cache
 
     try:
-        raw = json.loads(config_path.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError) as exc:
+        raw = orjson.loads(config_path.read_bytes())
+    except (orjson.JSONDecodeError, OSError) as exc:
         logger.error("sandstorm.json: failed to read — %s", exc)
         return None
 
@@ -306,14 +327,14 @@ def load_sandstorm_config() -> dict | None:
 
 
 def _build_agent_config(
-    request: QueryRequest,
+    request: "QueryRequest",
     sandstorm_config: dict,
     disk_skills: dict[str, dict[str, str]],
 ) -> tuple[dict, dict[str, dict[str, str]]]:
     """Build agent_config dict and merged_skills from config + request overrides.
 
     Returns (agent_config, merged_skills) so the caller can upload skills
-    and write agent_config.json into the sandbox.
+    and pass agent_config to the runner.
     """
     merged_skills = dict(disk_skills)
 
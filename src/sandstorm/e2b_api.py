@@ -1,11 +1,18 @@
 """Shared HTTP client for the E2B webhook API."""
 
-import json
-import urllib.error
-import urllib.request
+import asyncio
+
+import httpx
+import orjson
 
 E2B_WEBHOOK_API = "https://api.e2b.app/events/webhooks"
 
+# Cap on in-flight requests for batch calls (webhook_requests_concurrent)
+_MAX_CONCURRENT_REQUESTS = 8
+
+# One pooled client per process so repeated calls reuse TCP+TLS connections
+_http_client: httpx.Client | None = None
+
 
 class E2BApiError(RuntimeError):
     """Raised when the E2B webhook API returns an error or is unreachable."""
@@ -15,6 +22,28 @@ class E2BApiError(RuntimeError):
         self.status_code = status_code
 
 
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client, creating it on first use."""
+    global _http_client
+
+    if _http_client is None:
+        # follow_redirects matches the urllib behaviour this client replaced
+        _http_client = httpx.Client(timeout=30, follow_redirects=True)
+    return _http_client
+
+
+def _request_args(api_key: str, data: dict | None) -> tuple[dict[str, str], bytes | None]:
+    headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
+    return headers, orjson.dumps(data) if data else None
+
+
+def _parse_response(resp: httpx.Response) -> dict | list | None:
+    if resp.status_code >= 400:
+        detail = resp.content.decode(errors="replace")
+        raise E2BApiError(f"E2B API returned {resp.status_code}: {detail}", resp.status_code)
+    return orjson.loads(resp.content) if resp.content else None
+
+
 def webhook_request(
     method: str, path: str, api_key: str, data: dict | None = None
 ) -> dict | list | None:
@@ -22,16 +51,41 @@ def webhook_request(
 
     Raises E2BApiError on HTTP errors or connection failures.
     """
-    url = f"{E2B_WEBHOOK_API}{path}"
-    headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
-    body = json.dumps(data).encode() if data else None
-    req = urllib.request.Request(url, data=body, headers=headers, method=method)
+    headers, body = _request_args(api_key, data)
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            raw = resp.read()
-            return json.loads(raw) if raw else None
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode(errors="replace")
-        raise E2BApiError(f"E2B API returned {exc.code}: {detail}", exc.code) from exc
-    except urllib.error.URLError as exc:
-        raise E2BApiError(f"Failed to reach E2B API: {exc.reason}") from exc
+        resp = get_http_client().request(
+            method, f"{E2B_WEBHOOK_API}{path}", content=body, headers=headers
+        )
+    except httpx.HTTPError as exc:
+        raise E2BApiError(f"Failed to reach E2B API: {exc}") from exc
+    return _parse_response(resp)
+
+
+async def webhook_requests_concurrent(
+    calls: list[tuple[str, str]], api_key: str
+) -> list[dict | list | E2BApiError | None]:
+    """Run several (method, path) webhook API calls concurrently.
+
+    Requests share one HTTP/2 connection and at most _MAX_CONCURRENT_REQUESTS
+    are in flight. Returns one result per call, in order; a failed call yields
+    its E2BApiError instead of raising so the others still complete.
+    """
+    headers, _ = _request_args(api_key, None)
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+
+    async with httpx.AsyncClient(
+        base_url=E2B_WEBHOOK_API, headers=headers, timeout=30, follow_redirects=True, http2=True
+    ) as client:
+
+        async def _one(method: str, path: str) -> dict | list | E2BApiError | None:
+            async with semaphore:
+                try:
+                    resp = await client.request(method, path)
+                except httpx.HTTPError as exc:
+                    return E2BApiError(f"Failed to reach E2B API: {exc}")
+            try:
+                return _parse_response(resp)
+            except E2BApiError as exc:
+                return exc
+
+        return await asyncio.gather(*(_one(method, path) for method, path in calls))
@@ -2,15 +2,15 @@
 
 import base64
 import contextlib
-import json
 import logging
 import posixpath
 import shlex
 from pathlib import Path
 
+import orjson
 from e2b import AsyncSandbox
 
-from .config import _SKILL_NAME_PATTERN
+from .models import NAME_PATTERN
 from .telemetry import get_tracer
 
 logger = logging.getLogger(__name__)
@@ -61,6 +61,16 @@ async def _upload_files(sbx: AsyncSandbox, files: dict[str, str], request_id: st
             ) from exc
 
 
+async def _upload_binary_files(
+    sbx: AsyncSandbox, files: dict[str, bytes], request_id: str
+) -> None:
+    """Upload binary files (e.g. Slack attachments) to the sandbox home directory."""
+    logger.info("[%s] Uploading %d binary files", request_id, len(files))
+    await sbx.files.write_files(
+        [{"path": f"/home/user/{path}", "data": data} for path, data in files.items()]
+    )
+
+
 def _normalize_relative_path(path: str) -> str:
     """Normalize a sandbox-relative path to a stable, slash-separated form."""
     normalized = posixpath.normpath(path).lstrip("/")
@@ -85,7 +95,7 @@ def _load_skills_dir(skills_dir: str) -> dict[str, dict[str, str]]:
     for entry in base.iterdir():
         if not entry.is_dir():
             continue
-        if not _SKILL_NAME_PATTERN.match(entry.name):
+        if not NAME_PATTERN.fullmatch(entry.name):
             logger.warning("skills_dir: skipping %r (invalid name)", entry.name)
             continue
         skill_file = entry / "SKILL.md"
@@ -245,7 +255,7 @@ async def _extract_generated_files(
                 total_size += size
                 encoded = base64.b64encode(raw).decode("ascii")
                 events.append(
-                    json.dumps(
+                    orjson.dumps(
                         {
                             "type": "file",
                             "name": posixpath.basename(relative_path),
@@ -254,7 +264,7 @@ async def _extract_generated_files(
                             "size": size,
                             "data": encoded,
                         }
-                    )
+                    ).decode()
                 )
                 logger.info("[%s] Extracted file: %s (%d bytes)", request_id, relative_path, size)
             except Exception:
@@ -1,20 +1,21 @@
 import asyncio
+import functools
 import hashlib
 import hmac
-import json
 import logging
 import os
 import secrets
 import time
-import uuid
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+import orjson
 from e2b import AuthenticationException, SandboxException
 from fastapi import Depends, FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse
-from sse_starlette.sse import EventSourceResponse
+from fastapi.sse import EventSourceResponse, ServerSentEvent
 
 from . import _LOG_DATEFMT, _LOG_FORMAT, __version__, cancellation, telemetry
 from .auth import load_api_keys, verify_api_token
@@ -23,7 +24,13 @@ from .config import load_sandstorm_config
 from .e2b_api import webhook_request
 from .memory import memory_store
 from .models import QueryRequest
-from .sandbox import run_agent_in_sandbox
+from .sandbox import (
+    probe_template,
+    run_agent_in_sandbox,
+    start_warm_pool,
+    stop_warm_pool,
+    warm_sandbox_request_id,
+)
 from .store import build_config_snapshot, run_store
 from .telemetry import (
     get_tracer,
@@ -46,6 +53,15 @@ logger = logging.getLogger(__name__)
 _WEBHOOK_SECRET = os.environ.get("SANDSTORM_WEBHOOK_SECRET", "")
 
 
+@functools.lru_cache(maxsize=1)
+def _webhook_hmac(secret: str) -> hmac.HMAC:
+    """Return an HMAC-SHA256 keyed with *secret*; callers .copy() it per request.
+
+    Keyed on the secret so an auto-generated or rotated secret gets a fresh key.
+    """
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+
 def _auto_register_webhook() -> str | None:
     """Register an E2B lifecycle webhook from sandstorm.json config.
 
@@ -61,8 +77,9 @@ def _auto_register_webhook() -> str | None:
         return None
 
     # Auto-append /webhooks/e2b if not already present
-    if not webhook_url.rstrip("/").endswith("/webhooks/e2b"):
-        webhook_url = webhook_url.rstrip("/") + "/webhooks/e2b"
+    base_url = webhook_url.rstrip("/")
+    if not base_url.endswith("/webhooks/e2b"):
+        webhook_url = base_url + "/webhooks/e2b"
 
     # Resolve or generate webhook secret
     secret = os.environ.get("SANDSTORM_WEBHOOK_SECRET", "")
@@ -132,7 +149,7 @@ async def _setup_triggers(app: FastAPI):
 
     async def _fire_trigger(trigger: TriggerDefinition, *, rendered: str | None = None) -> None:
         prompt = rendered if rendered is not None else trigger.prompt
-        req_id = f"trigger-{trigger.name}-{uuid.uuid4().hex[:6]}"
+        req_id = f"trigger-{trigger.name}-{secrets.token_hex(3)}"
         try:
             request = QueryRequest(
                 prompt=prompt,
@@ -237,12 +254,26 @@ async def lifespan(app: FastAPI):
         logger.warning(
             "SANDSTORM_WEBHOOK_SECRET not set — webhook signature verification disabled"
         )
-    webhook_id = _auto_register_webhook()
+    # Registration is a blocking E2B API call (30 s timeout); run it on a
+    # thread so startup and the first requests never wait on it
+    register_task = asyncio.create_task(asyncio.to_thread(_auto_register_webhook))
     scheduler_task = await _setup_triggers(app)
+    # Background so startup never blocks on E2B; requests before it finishes
+    # simply try the custom template first
+    probe_task = asyncio.create_task(probe_template())
+    start_warm_pool()
     yield
+    probe_task.cancel()
     if scheduler_task is not None:
         scheduler_task.cancel()
-    _auto_deregister_webhook(webhook_id)
+    await stop_warm_pool()
+    # The registration thread can't be cancelled and would still register after
+    # a timeout, leaking a webhook per restart; wait it out (bounded by its own
+    # HTTP timeout) so the id it returns is always deregistered
+    if not register_task.done():
+        logger.info("Waiting for E2B webhook registration to finish before deregistering")
+    webhook_id = await register_task
+    await asyncio.to_thread(_auto_deregister_webhook, webhook_id)
 
 
 app = FastAPI(
@@ -271,7 +302,8 @@ except ImportError:
     pass
 
 
-_DASHBOARD_HTML = (Path(__file__).parent / "dashboard.html").read_text()
+# Kept as bytes so each response sends it without re-encoding
+_DASHBOARD_HTML = (Path(__file__).parent / "dashboard.html").read_bytes()
 
 
 @app.get("/", summary="Dashboard", description="Runs dashboard UI.", response_class=HTMLResponse)
@@ -317,6 +349,35 @@ async def health(deep: bool = Query(False, description="Run deep health checks")
     return result
 
 
+# Bodies above this are verified and parsed off the event loop; below it the
+# thread hop costs more than the HMAC and JSON parse themselves
+_WEBHOOK_INLINE_MAX_BYTES = 64 * 1024
+
+
+class _InvalidWebhookSignature(ValueError):
+    """Raised when an E2B webhook's HMAC signature does not match the body."""
+
+
+def _verify_and_parse_webhook(body: bytes, raw_signature: str, secret: str) -> dict:
+    """Verify the HMAC signature when *secret* is set, then parse the JSON body.
+
+    Raises _InvalidWebhookSignature or orjson.JSONDecodeError.
+    """
+    if secret:
+        # Strip optional "sha256=" prefix (common webhook convention)
+        signature = raw_signature.removeprefix("sha256=")
+        try:
+            signature_bytes = bytes.fromhex(signature)
+        except ValueError:
+            # Malformed hex can never match
+            signature_bytes = b""
+        mac = _webhook_hmac(secret).copy()
+        mac.update(body)
+        if not hmac.compare_digest(signature_bytes, mac.digest()):
+            raise _InvalidWebhookSignature("invalid webhook signature")
+    return orjson.loads(body)
+
+
 @app.post(
     "/webhooks/e2b",
     summary="E2B webhook receiver",
@@ -328,36 +389,49 @@ async def health(deep: bool = Query(False, description="Run deep health checks")
 async def e2b_webhook(request: Request):
     """Receive E2B sandbox lifecycle events for logging and diagnostics."""
     body = await request.body()
+    raw_signature = request.headers.get("e2b-signature", "")
 
     with get_tracer().start_as_current_span("webhook.e2b") as span:
-        # Verify HMAC signature when a secret is configured
-        if _WEBHOOK_SECRET:
-            raw_signature = request.headers.get("e2b-signature", "")
-            # Strip optional "sha256=" prefix (common webhook convention)
-            signature = raw_signature.removeprefix("sha256=")
-            expected = hmac.new(_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
-            if not hmac.compare_digest(signature, expected):
-                logger.warning("E2B webhook: invalid signature — rejecting")
-                sig_err = ValueError("invalid webhook signature")
-                set_span_error(span, sig_err)
-                record_error(error_type="webhook_signature")
-                return JSONResponse({"error": "invalid signature"}, status_code=401)
-
         try:
-            payload = json.loads(body)
-        except json.JSONDecodeError as exc:
+            if len(body) > _WEBHOOK_INLINE_MAX_BYTES:
+                payload = await asyncio.to_thread(
+                    _verify_and_parse_webhook, body, raw_signature, _WEBHOOK_SECRET
+                )
+            else:
+                payload = _verify_and_parse_webhook(body, raw_signature, _WEBHOOK_SECRET)
+        except _InvalidWebhookSignature as exc:
+            logger.warning("E2B webhook: invalid signature — rejecting")
+            set_span_error(span, exc)
+            record_error(error_type="webhook_signature")
+            return JSONResponse({"error": "invalid signature"}, status_code=401)
+        except orjson.JSONDecodeError as exc:
             set_span_error(span, exc)
             record_error(error_type="webhook_json")
             return JSONResponse({"error": "invalid JSON"}, status_code=400)
 
         event_type = payload.get("type", "unknown")
         sandbox_id = payload.get("sandboxId", "unknown")
-        metadata = (payload.get("eventData") or {}).get("sandbox_metadata") or {}
-        request_id = metadata.get("request_id", "unknown")
+        event_data = payload.get("eventData")
+        metadata = event_data.get("sandbox_metadata") if isinstance(event_data, dict) else None
+        request_id = (
+            metadata.get("request_id", "unknown") if isinstance(metadata, dict) else "unknown"
+        )
+        if request_id == "warm-pool":
+            # Pooled sandboxes are created before their request; resolve the real one
+            request_id = (
+                warm_sandbox_request_id(
+                    sandbox_id, forget=event_type == "sandbox.lifecycle.killed"
+                )
+                or request_id
+            )
 
-        span.set_attribute("sandstorm.webhook.event_type", event_type)
-        span.set_attribute("sandstorm.sandbox_id", sandbox_id)
-        span.set_attribute("sandstorm.request_id", request_id)
+        span.set_attributes(
+            {
+                "sandstorm.webhook.event_type": event_type,
+                "sandstorm.sandbox_id": sandbox_id,
+                "sandstorm.request_id": request_id,
+            }
+        )
 
         logger.info(
             "[%s] E2B lifecycle event: %s sandbox=%s",
@@ -378,9 +452,12 @@ async def e2b_webhook(request: Request):
         " Returns a Server-Sent Events stream of JSON messages"
         " including system, assistant, result, and error events."
     ),
+    response_class=EventSourceResponse,
 )
-async def query(request: QueryRequest, token: str = Depends(verify_api_token)):
-    req_id = uuid.uuid4().hex[:8]
+async def query(
+    request: QueryRequest, token: str = Depends(verify_api_token)
+) -> AsyncIterator[ServerSentEvent]:
+    req_id = secrets.token_hex(4)
     logger.info(
         "[%s] Query received: prompt=%s model=%s",
         req_id,
@@ -391,86 +468,92 @@ async def query(request: QueryRequest, token: str = Depends(verify_api_token)):
     if request.remember:
         memory_store.remember(request.team_id, request.user_id, request.remember)
 
-    async def event_generator():
-        start = time.monotonic()
-        run_store.create(
-            id=req_id,
-            prompt=request.prompt,
-            model=request.model,
-            files_count=len(request.files) if request.files else 0,
-            team_id=request.team_id,
-            user_id=request.user_id,
-            raw_prompt=request.prompt,
-            config_snapshot=build_config_snapshot(
-                {
-                    "model": request.model,
-                    "max_turns": request.max_turns,
-                    "timeout": request.timeout,
-                    "allowed_tools": request.allowed_tools,
-                    "files": request.files,
-                }
-            ),
-        )
-        cancellation.register_run(req_id)
-        cost_usd = None
-        num_turns = None
-        model = request.model
-        agent_session_id: str | None = None
-        with get_tracer().start_as_current_span(
-            "query",
-            attributes={
-                "sandstorm.request_id": req_id,
-                "sandstorm.model": request.model or "",
-                "sandstorm.timeout": request.timeout or 0,
-                "sandstorm.file_count": len(request.files) if request.files else 0,
-            },
-        ) as span:
-            try:
-                async for line in run_agent_in_sandbox(request, req_id):
-                    # Extract metadata from streamed messages
+    start = time.monotonic()
+    run_store.create(
+        id=req_id,
+        prompt=request.prompt,
+        model=request.model,
+        files_count=len(request.files) if request.files else 0,
+        team_id=request.team_id,
+        user_id=request.user_id,
+        raw_prompt=request.prompt,
+        config_snapshot=build_config_snapshot(
+            {
+                "model": request.model,
+                "max_turns": request.max_turns,
+                "timeout": request.timeout,
+                "allowed_tools": request.allowed_tools,
+                "files": request.files,
+            }
+        ),
+    )
+    cancellation.register_run(req_id)
+    cost_usd = None
+    num_turns = None
+    model = request.model
+    agent_session_id: str | None = None
+    with get_tracer().start_as_current_span(
+        "query",
+        attributes={
+            "sandstorm.request_id": req_id,
+            "sandstorm.model": request.model or "",
+            "sandstorm.timeout": request.timeout or 0,
+            "sandstorm.file_count": len(request.files) if request.files else 0,
+        },
+    ) as span:
+        try:
+            async for line in run_agent_in_sandbox(request, req_id):
+                # Extract metadata from streamed messages. Only result and
+                # system lines carry it; the substring test skips parsing the
+                # far more common (and larger) assistant/user lines
+                if line.startswith("{") and ('"result"' in line or '"system"' in line):
                     try:
-                        parsed = json.loads(line)
-                        if parsed.get("type") == "result":
+                        parsed = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        logger.debug("[%s] Unparseable stream line: %.200s", req_id, line)
+                        parsed = None
+                    if isinstance(parsed, dict):
+                        msg_type = parsed.get("type")
+                        if msg_type == "result":
                             cost = parsed.get("total_cost_usd")
                             cost_usd = cost if cost is not None else parsed.get("cost_usd")
                             num_turns = parsed.get("num_turns")
                             # Some SDK versions emit session_id on the result too
                             agent_session_id = parsed.get("session_id") or agent_session_id
-                        elif parsed.get("type") == "system" and parsed.get("subtype") == "init":
+                        elif msg_type == "system" and parsed.get("subtype") == "init":
                             model = parsed.get("model") or model
                             # Captured at init so follow-up runs in the same Slack
                             # thread can `resume=<session_id>` to preserve context
                             agent_session_id = parsed.get("session_id") or agent_session_id
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-                    yield {"data": line}
-            except (ValueError, RuntimeError, SandboxException, AuthenticationException) as e:
-                set_span_error(span, e)
-                record_error(error_type=type(e).__name__)
-                record_request(model=request.model, status="error")
-                logger.error("[%s] Query failed: %s", req_id, e, exc_info=True)
-                duration = time.monotonic() - start
-                run_store.fail(req_id, str(e), duration)
-                yield {
-                    "data": json.dumps({"type": "error", "error": str(e), "request_id": req_id})
-                }
-            else:
-                record_request(model=request.model, status="ok")
-                logger.info("[%s] Query completed", req_id)
-                duration = time.monotonic() - start
-                run_store.complete(
-                    req_id,
-                    cost_usd,
-                    num_turns,
-                    duration,
-                    model,
-                    agent_session_id=agent_session_id,
-                )
-            finally:
-                record_request_duration(time.monotonic() - start, model=request.model)
-                cancellation.unregister_run(req_id)
-
-    return EventSourceResponse(event_generator(), ping=30)
+                # Lines are already JSON — raw_data skips re-encoding
+                yield ServerSentEvent(raw_data=line)
+        except (ValueError, RuntimeError, SandboxException, AuthenticationException) as e:
+            set_span_error(span, e)
+            record_error(error_type=type(e).__name__)
+            record_request(model=request.model, status="error")
+            logger.error("[%s] Query failed: %s", req_id, e, exc_info=True)
+            duration = time.monotonic() - start
+            run_store.fail(req_id, str(e), duration)
+            yield ServerSentEvent(
+                raw_data=orjson.dumps(
+                    {"type": "error", "error": str(e), "request_id": req_id}
+                ).decode()
+            )
+        else:
+            record_request(model=request.model, status="ok")
+            logger.info("[%s] Query completed", req_id)
+            duration = time.monotonic() - start
+            run_store.complete(
+                req_id,
+                cost_usd,
+                num_turns,
+                duration,
+                model,
+                agent_session_id=agent_session_id,
+            )
+        finally:
+            record_request_duration(time.monotonic() - start, model=request.model)
+            cancellation.unregister_run(req_id)
 
 
 @app.post(
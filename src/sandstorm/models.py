@@ -1,11 +1,20 @@
 import os
 import re
 from posixpath import normpath
+from typing import Annotated
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    StringConstraints,
+    field_validator,
+    model_validator,
+)
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
-
-# Shared pattern for validating skill and agent names
-NAME_PATTERN = re.compile(r"^[a-zA-Z0-9_-]+$")
+# Shared pattern for validating skill and agent names; use with fullmatch
+# (a "$" anchor with .match would also accept a trailing newline)
+NAME_PATTERN = re.compile(r"[a-zA-Z0-9_-]+")
 WINDOWS_DRIVE_ABS_PATH_PATTERN = re.compile(r"^[a-zA-Z]:[\\/]")
 
 PROVIDER_TOGGLE_KEYS = (
@@ -15,6 +24,11 @@ PROVIDER_TOGGLE_KEYS = (
 )
 
 
+# Extra agent/skill names as dict keys, checked by pydantic-core's regex engine
+# (which has no trailing-newline leniency for "$")
+_Name = Annotated[str, StringConstraints(pattern=rf"^{NAME_PATTERN.pattern}$")]
+
+
 class QueryRequest(BaseModel):
     model_config = ConfigDict(
         json_schema_extra={
@@ -67,6 +81,7 @@ class QueryRequest(BaseModel):
     )
     files: dict[str, str] | None = Field(
         None,
+        max_length=20,
         description="Files to upload to the sandbox. Keys are relative paths under /home/user/.",
     )
 
@@ -138,7 +153,7 @@ class QueryRequest(BaseModel):
     )
 
     # Extra inline definitions (merged before whitelisting)
-    extra_agents: dict[str, dict] | None = Field(
+    extra_agents: dict[_Name, dict] | None = Field(
         default=None,
         description=(
             "Extra agent definitions merged with config agents before"
@@ -148,7 +163,7 @@ class QueryRequest(BaseModel):
             " agent schema: model, tools, instructions, etc.)."
         ),
     )
-    extra_skills: dict[str, str] | None = Field(
+    extra_skills: dict[_Name, str] | None = Field(
         default=None,
         description=(
             "Extra skill definitions (name -> markdown content) merged with"
@@ -157,46 +172,33 @@ class QueryRequest(BaseModel):
         ),
     )
 
-    @field_validator("extra_agents")
-    @classmethod
-    def validate_extra_agent_names(cls, v: dict[str, dict] | None) -> dict[str, dict] | None:
-        if v is None:
-            return v
-        for name in v:
-            if not NAME_PATTERN.match(name):
-                raise ValueError(f"Invalid agent name {name!r}: must match [a-zA-Z0-9_-]+")
-        return v
-
-    @field_validator("extra_skills")
-    @classmethod
-    def validate_extra_skill_names(cls, v: dict[str, str] | None) -> dict[str, str] | None:
-        if v is None:
-            return v
-        for name in v:
-            if not NAME_PATTERN.match(name):
-                raise ValueError(f"Invalid skill name {name!r}: must match [a-zA-Z0-9_-]+")
-        return v
-
     @field_validator("files")
     @classmethod
     def validate_file_paths(cls, v: dict[str, str] | None) -> dict[str, str] | None:
         if v is None:
             return v
-        if len(v) > 20:
-            raise ValueError(f"Too many files: {len(v)} (max 20)")
-        total_size = sum(len(content.encode()) for content in v.values())
-        if total_size > 10_000_000:  # 10MB
-            raise ValueError(f"Total file size {total_size:,} bytes exceeds 10MB limit")
-        safe = {}
-        for path, content in v.items():
+        # ASCII content is the common case; its UTF-8 size is len() without an
+        # encode copy. Stop at the first file that crosses the limit.
+        total_size = 0
+        for content in v.values():
+            total_size += len(content) if content.isascii() else len(content.encode())
+            if total_size > 10_000_000:  # 10MB
+                raise ValueError(
+                    f"Total file size exceeds 10MB limit (at least {total_size:,} bytes)"
+                )
+        normalized_paths = []
+        for path in v:
             if path.startswith(("/", "\\")) or WINDOWS_DRIVE_ABS_PATH_PATTERN.match(path):
                 raise ValueError(f"Absolute paths are not allowed: {path}")
 
             normalized = normpath(path).lstrip("/")
             if not normalized or normalized.startswith("..") or normalized == ".":
                 raise ValueError(f"Path traversal not allowed: {path}")
-            safe[normalized] = content
-        return safe
+            normalized_paths.append(normalized)
+        # Only rebuild the dict when some path actually changed
+        if all(n == p for n, p in zip(normalized_paths, v, strict=True)):
+            return v
+        return dict(zip(normalized_paths, v.values(), strict=True))
 
     @model_validator(mode="after")
     def resolve_api_keys(self):
@@ -208,9 +210,13 @@ class QueryRequest(BaseModel):
         if not self.e2b_api_key:
             self.e2b_api_key = os.environ.get("E2B_API_KEY")
 
-        uses_alternate_provider = any(os.environ.get(k) for k in PROVIDER_TOGGLE_KEYS)
-        uses_custom_base_url = bool(os.environ.get("ANTHROPIC_BASE_URL"))
-        has_any_auth = self.anthropic_api_key or uses_alternate_provider or uses_custom_base_url
+        # Provider toggles and a custom base URL only matter without a key,
+        # so the common case skips those env lookups
+        has_any_auth = (
+            self.anthropic_api_key
+            or any(os.environ.get(k) for k in PROVIDER_TOGGLE_KEYS)
+            or os.environ.get("ANTHROPIC_BASE_URL")
+        )
         if not has_any_auth:
             raise ValueError(
                 "anthropic_api_key is required — pass it in the request body "
@@ -0,0 +1,139 @@
+"""Warm pool of pre-created E2B sandboxes to hide cold-start latency.
+
+Opt-in via ``SANDSTORM_WARM_POOL_SIZE`` (default 0 = disabled). The pool is
+filled in the background at startup and topped up after every checkout, so a
+request only pays for sandbox boot when the pool has run dry.
+
+Pooled sandboxes are created with the server's ``E2B_API_KEY`` and no envs;
+the caller passes per-request envs to the runner command instead. A
+background refresher replaces idle sandboxes shortly before E2B would reap
+them, so the pool stays warm through quiet periods.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from e2b import AsyncSandbox
+
+from .telemetry import sandbox_stopped
+
+logger = logging.getLogger(__name__)
+
+# Lifetime pooled sandboxes are created with; checkout resets it per request
+POOL_SANDBOX_TIMEOUT = 3600
+# Discard idle sandboxes this long before E2B's timeout would kill them
+_EXPIRY_MARGIN = 300
+# How often the refresher replaces idle sandboxes that are near expiry
+_REFRESH_INTERVAL = 60
+# How long close() waits for in-flight creations so their sandboxes can be killed
+_CLOSE_CREATE_WAIT = 15
+
+
+class WarmPool:
+    """Fixed-size pool of idle sandboxes, refilled by background tasks."""
+
+    def __init__(
+        self,
+        size: int,
+        api_key: str,
+        factory: Callable[[], Awaitable[AsyncSandbox]],
+    ) -> None:
+        self.size = size
+        self.api_key = api_key
+        self._factory = factory
+        self._idle: deque[tuple[float, AsyncSandbox]] = deque()
+        self._pending = 0
+        # Strong references: asyncio only keeps weak refs to running tasks
+        self._create_tasks: set[asyncio.Task] = set()
+        self._kill_tasks: set[asyncio.Task] = set()
+        self._refresh_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Fill the pool and start the background refresher."""
+        self.fill()
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(_REFRESH_INTERVAL)
+            # Also retries creations that failed since the last pass
+            self._drop_expired()
+            self.fill()
+
+    def fill(self) -> None:
+        """Start background creation until idle + in-flight sandboxes reach size."""
+        while len(self._idle) + self._pending < self.size:
+            self._pending += 1
+            task = asyncio.create_task(self._create_one())
+            self._create_tasks.add(task)
+            task.add_done_callback(self._create_tasks.discard)
+
+    async def _create_one(self) -> None:
+        try:
+            sbx = await self._factory()
+        except Exception:
+            logger.warning("Warm pool: failed to pre-create sandbox", exc_info=True)
+            return
+        finally:
+            self._pending -= 1
+        self._idle.append((time.monotonic(), sbx))
+
+    def acquire(self) -> AsyncSandbox | None:
+        """Pop a fresh idle sandbox (never waits on creation) and trigger a refill."""
+        self._drop_expired()
+        sbx = self._idle.popleft()[1] if self._idle else None
+        self.fill()
+        return sbx
+
+    def _drop_expired(self) -> None:
+        """Discard idle sandboxes that are close to E2B's timeout."""
+        deadline = time.monotonic() - (POOL_SANDBOX_TIMEOUT - _EXPIRY_MARGIN)
+        # Sandboxes are appended as they finish booting, so the oldest is first
+        while self._idle and self._idle[0][0] < deadline:
+            self._discard(self._idle.popleft()[1])
+
+    def _discard(self, sbx: AsyncSandbox) -> None:
+        task = asyncio.create_task(self._kill(sbx))
+        self._kill_tasks.add(task)
+        task.add_done_callback(self._kill_tasks.discard)
+
+    @staticmethod
+    async def _kill(sbx: AsyncSandbox) -> None:
+        sandbox_stopped()
+        with contextlib.suppress(Exception):
+            await sbx.kill()
+
+    async def close(self) -> None:
+        """Stop the refresher and kill every idle and in-flight sandbox.
+
+        In-flight creations are awaited (up to _CLOSE_CREATE_WAIT) rather than
+        cancelled: cancelling after E2B has created the sandbox would lose the
+        handle and leave it running, and billed, for POOL_SANDBOX_TIMEOUT.
+        """
+        self.size = 0
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+        if self._create_tasks:
+            _, still_pending = await asyncio.wait(
+                set(self._create_tasks), timeout=_CLOSE_CREATE_WAIT
+            )
+            if still_pending:
+                logger.warning(
+                    "Warm pool: %d sandbox creation(s) still running at shutdown — cancelling",
+                    len(still_pending),
+                )
+                for task in still_pending:
+                    task.cancel()
+                await asyncio.gather(*still_pending, return_exceptions=True)
+        # Finished creations appended their sandboxes to _idle; kill them too
+        idle = [sbx for _, sbx in self._idle]
+        self._idle.clear()
+        await asyncio.gather(*self._kill_tasks, *(self._kill(sbx) for sbx in idle))
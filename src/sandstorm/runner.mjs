@@ -2,7 +2,8 @@
  * Agent runner script — executed inside the E2B sandbox.
  *
  * Uses the Claude Agent SDK's query() function directly (not the CLI).
- * Reads config from agent_config.json, streams each SDK message
+ * Reads config from $SANDSTORM_AGENT_CONFIG (or agent_config.json for large
+ * configs), streams each SDK message
  * as a JSON line to stdout.
  */
 import { query } from "@anthropic-ai/claude-agent-sdk";
@@ -11,7 +12,11 @@ import { dirname, join } from "path";
 import { fileURLToPath } from "url";
 
 const __dirname = dirname(fileURLToPath(import.meta.url));
-const config = JSON.parse(readFileSync(join(__dirname, "agent_config.json"), "utf-8"));
+const config = JSON.parse(
+  process.env.SANDSTORM_AGENT_CONFIG ?? readFileSync(join(__dirname, "agent_config.json"), "utf-8"),
+);
+// Don't leak the config (prompt, MCP credentials) into the agent's child processes
+delete process.env.SANDSTORM_AGENT_CONFIG;
 
 const options = {
   cwd: config.cwd || "/home/user",
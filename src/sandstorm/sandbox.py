@@ -2,28 +2,30 @@
 
 import asyncio
 import contextlib
-import json
 import logging
 import os
-import posixpath
-import shlex
 import time
-from collections.abc import AsyncGenerator
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Awaitable
 from importlib.resources import files as pkg_files
 from pathlib import Path
 
-from e2b import AsyncSandbox, NotFoundException
+import anyio
+import orjson
+from e2b import AsyncSandbox, AsyncTemplate, NotFoundException
 
 from .cancellation import is_cancelled
-from .config import _PROVIDER_ENV_KEYS, _build_agent_config, load_sandstorm_config
+from .config import _build_agent_config, _provider_envs, load_sandstorm_config
 from .files import (
     _create_extraction_marker,
     _extract_generated_files,
     _load_skills_dir,
+    _upload_binary_files,
     _upload_files,
     _upload_skills,
 )
 from .models import QueryRequest
+from .pool import POOL_SANDBOX_TIMEOUT, WarmPool
 from .telemetry import (
     get_tracer,
     record_agent_execution,
@@ -43,15 +45,27 @@ FALLBACK_TEMPLATE = "claude-code"
 # Claude Agent SDK version — single source of truth (also imported by build_template.py)
 SDK_VERSION = "0.2.112"
 
-_QUEUE_MAXSIZE = 10_000  # Buffer for sync→async bridge; drops if consumer is slow
+_QUEUE_MAXSIZE = 10_000  # Stream buffer for sync→async bridge; drops if consumer is slow
 _SDK_INSTALL_TIMEOUT = 120  # Fallback npm install timeout (seconds)
 _RUNNER_TIMEOUT = 1800  # Max agent execution time (30 minutes)
+# Agent configs up to this size reach the runner via an env var instead of an
+# uploaded agent_config.json (Linux caps a single env string at 128 KiB)
+_CONFIG_ENV_MAX_BYTES = 64 * 1024
 
 # Path inside the sandbox where GCP credentials are uploaded
 _GCP_CREDENTIALS_SANDBOX_PATH = "/home/user/.config/gcloud/service_account.json"
 
-# Load the runner script that executes inside the sandbox
-_RUNNER_SCRIPT = pkg_files("sandstorm").joinpath("runner.mjs").read_text()
+# Load the runner script that executes inside the sandbox (kept as bytes so
+# uploads skip a per-request UTF-8 encode)
+_RUNNER_SCRIPT = pkg_files("sandstorm").joinpath("runner.mjs").read_bytes()
+
+# Claude Agent SDK settings — static, so serialized once instead of per request.
+# Experimental betas are disabled unless skills are in play.
+_SETTINGS: dict = {"permissions": {"allow": [], "deny": []}}
+_SETTINGS_JSON = orjson.dumps(_SETTINGS)
+_SETTINGS_JSON_NO_BETAS = orjson.dumps(
+    {**_SETTINGS, "env": {"CLAUDE_CODE_DISABLE_EXPERIMENTAL_BETAS": "1"}}
+)
 
 
 def _read_gcp_credentials() -> str | None:
@@ -76,6 +90,35 @@ def _read_gcp_credentials() -> str | None:
         ) from exc
 
 
+# Result of the startup template probe: None = unknown (try TEMPLATE and fall
+# back on NotFound), False = skip straight to FALLBACK_TEMPLATE.
+_template_available: bool | None = None
+
+
+async def probe_template() -> None:
+    """Check once whether TEMPLATE exists so requests don't each pay a failed create.
+
+    Call from the server lifespan. Uses the server's E2B_API_KEY; without one,
+    or if the lookup itself fails, availability stays unknown.
+    """
+    global _template_available
+
+    api_key = os.environ.get("E2B_API_KEY")
+    if not api_key:
+        return
+    try:
+        _template_available = await AsyncTemplate.exists(TEMPLATE, api_key=api_key)
+    except Exception:
+        logger.warning("Template probe for %r failed", TEMPLATE, exc_info=True)
+        return
+    if not _template_available:
+        logger.warning(
+            "Template %r not found, using %r for all sandboxes (adds ~15s overhead)",
+            TEMPLATE,
+            FALLBACK_TEMPLATE,
+        )
+
+
 async def _create_sandbox(
     api_key: str | None,
     timeout: int,
@@ -88,24 +131,26 @@ async def _create_sandbox(
     ) as span:
         start = time.monotonic()
         logger.info("[%s] Creating sandbox template=%s", request_id, TEMPLATE)
-        used_fallback = False
-        try:
-            sbx = await AsyncSandbox.create(
-                template=TEMPLATE,
-                api_key=api_key,
-                timeout=timeout,
-                envs=envs,
-                metadata={"request_id": request_id},
-            )
-        except NotFoundException:
-            used_fallback = True
-            span.set_attribute("sandstorm.template_fallback", True)
-            logger.warning(
-                "[%s] Template %r not found, falling back to %r (adds ~15s overhead)",
-                request_id,
-                TEMPLATE,
-                FALLBACK_TEMPLATE,
-            )
+        sbx: AsyncSandbox | None = None
+        used_fallback = _template_available is False
+        if not used_fallback:
+            try:
+                sbx = await AsyncSandbox.create(
+                    template=TEMPLATE,
+                    api_key=api_key,
+                    timeout=timeout,
+                    envs=envs,
+                    metadata={"request_id": request_id},
+                )
+            except NotFoundException:
+                used_fallback = True
+                logger.warning(
+                    "[%s] Template %r not found, falling back to %r (adds ~15s overhead)",
+                    request_id,
+                    TEMPLATE,
+                    FALLBACK_TEMPLATE,
+                )
+        if sbx is None:
             sbx = await AsyncSandbox.create(
                 template=FALLBACK_TEMPLATE,
                 api_key=api_key,
@@ -121,8 +166,12 @@ async def _create_sandbox(
                 timeout=_SDK_INSTALL_TIMEOUT,
             )
         duration = time.monotonic() - start
-        span.set_attribute("sandstorm.template_fallback", used_fallback)
-        span.set_attribute("sandstorm.sandbox_id", sbx.sandbox_id)
+        span.set_attributes(
+            {
+                "sandstorm.template_fallback": used_fallback,
+                "sandstorm.sandbox_id": sbx.sandbox_id,
+            }
+        )
         record_sandbox_creation(
             duration, template=FALLBACK_TEMPLATE if used_fallback else TEMPLATE
         )
@@ -156,9 +205,89 @@ async def _cleanup(task: asyncio.Task | None, sbx: AsyncSandbox, request_id: str
         await sbx.kill()
 
 
+_warm_pool: WarmPool | None = None
+
+# Pooled sandboxes carry request_id="warm-pool" in their E2B metadata, which
+# can't be updated after creation; remember which request checked each one out
+# so lifecycle webhooks can be attributed. Bounded so missed kill events can't
+# grow it without limit.
+_WARM_POOL_METADATA_ID = "warm-pool"
+_WARM_REQUEST_IDS_MAX = 1000
+_warm_request_ids: OrderedDict[str, str] = OrderedDict()
+
+
+def warm_sandbox_request_id(sandbox_id: str, *, forget: bool = False) -> str | None:
+    """Return the request that checked out pooled sandbox *sandbox_id*, if any.
+
+    Pass forget=True once the sandbox is gone (e.g. on its kill event).
+    """
+    if forget:
+        return _warm_request_ids.pop(sandbox_id, None)
+    return _warm_request_ids.get(sandbox_id)
+
+
+def start_warm_pool() -> None:
+    """Start pre-creating sandboxes when SANDSTORM_WARM_POOL_SIZE > 0.
+
+    Call from the server lifespan; requires E2B_API_KEY since pooled sandboxes
+    are created before any request (and its key) arrives.
+    """
+    global _warm_pool
+
+    try:
+        size = int(os.environ.get("SANDSTORM_WARM_POOL_SIZE") or 0)
+    except ValueError:
+        logger.warning("SANDSTORM_WARM_POOL_SIZE must be an integer — warm pool disabled")
+        return
+    api_key = os.environ.get("E2B_API_KEY")
+    if size <= 0 or not api_key:
+        return
+
+    _warm_pool = WarmPool(
+        size,
+        api_key,
+        lambda: _create_sandbox(api_key, POOL_SANDBOX_TIMEOUT, {}, _WARM_POOL_METADATA_ID),
+    )
+    _warm_pool.start()
+    logger.info("Warm pool enabled (size=%d)", size)
+
+
+async def stop_warm_pool() -> None:
+    """Kill idle pooled sandboxes. Safe to call when the pool is disabled."""
+    global _warm_pool
+
+    if _warm_pool is not None:
+        pool, _warm_pool = _warm_pool, None
+        await pool.close()
+
+
+async def _acquire_warm_sandbox(
+    api_key: str | None, timeout: int, request_id: str
+) -> AsyncSandbox | None:
+    """Check out a pooled sandbox created with the same E2B key, or return None."""
+    if _warm_pool is None or api_key != _warm_pool.api_key:
+        return None
+    while (sbx := _warm_pool.acquire()) is not None:
+        try:
+            await sbx.set_timeout(timeout)
+        except Exception:
+            # Reaped or otherwise gone — drop it and try the next one
+            logger.warning("[%s] Pooled sandbox %s unusable", request_id, sbx.sandbox_id)
+            sandbox_stopped()
+            with contextlib.suppress(Exception):
+                await sbx.kill()
+            continue
+        logger.info("[%s] Using warm sandbox %s", request_id, sbx.sandbox_id)
+        _warm_request_ids[sbx.sandbox_id] = request_id
+        if len(_warm_request_ids) > _WARM_REQUEST_IDS_MAX:
+            _warm_request_ids.popitem(last=False)
+        return sbx
+    return None
+
+
 def _to_str(data) -> str:
-    """Coerce callback data to str (E2B may pass non-string types)."""
-    return data if isinstance(data, str) else str(data)
+    """Coerce callback data to str (E2B may pass bytes)."""
+    return data.decode(errors="replace") if isinstance(data, bytes) else data
 
 
 async def run_agent_in_sandbox(
@@ -171,36 +300,42 @@ async def run_agent_in_sandbox(
     binary_files: dict[str, bytes] | None = None,
 ) -> AsyncGenerator[str, None]:
     """Create an E2B sandbox, run the Claude Agent SDK query(), and yield messages."""
-    queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=_QUEUE_MAXSIZE)
+    # Memory object stream instead of a Queue + None sentinel: closing the send
+    # side ends the consumer's `async for` cleanly.
+    send_stream, recv_stream = anyio.create_memory_object_stream[str](
+        max_buffer_size=_QUEUE_MAXSIZE
+    )
     _queue_full_warned = False
 
     def _enqueue(data: str) -> None:
-        """Put data on the queue, dropping if full (sync callbacks can't await)."""
+        """Push data onto the stream, dropping if full (sync callbacks can't await)."""
         nonlocal _queue_full_warned
         try:
-            queue.put_nowait(data)
-        except asyncio.QueueFull:
+            send_stream.send_nowait(data)
+        except anyio.WouldBlock:
             record_queue_drop()
             if not _queue_full_warned:
                 _queue_full_warned = True
                 logger.warning(
                     "[%s] Queue full (maxsize=%d), dropping messages — consumer can't keep up",
                     request_id,
-                    queue.maxsize,
+                    _QUEUE_MAXSIZE,
                 )
                 # Notify client via SSE so they know data was lost
-                with contextlib.suppress(asyncio.QueueFull):
-                    queue.put_nowait(
-                        json.dumps(
+                with contextlib.suppress(anyio.WouldBlock):
+                    send_stream.send_nowait(
+                        orjson.dumps(
                             {
                                 "type": "warning",
                                 "message": "Output buffer full, some messages may be dropped",
                             }
-                        )
+                        ).decode()
                     )
 
     sandstorm_config = load_sandstorm_config() or {}
     task = None
+    # Pooled sandboxes are created without envs; they get them per command
+    runner_envs: dict[str, str] | None = None
 
     # Load skills from skills_dir (needed by both paths for _build_agent_config)
     disk_skills: dict[str, dict[str, str]] = {}
@@ -218,6 +353,11 @@ async def run_agent_in_sandbox(
     if binary_files:
         input_file_names.update(binary_files.keys())
 
+    config_bytes = orjson.dumps(agent_config)
+    # Reconnected sandboxes may run a runner.mjs from an older deploy that only
+    # reads agent_config.json, so they always get the file.
+    config_via_env = not sandbox_id and len(config_bytes) <= _CONFIG_ENV_MAX_BYTES
+
     if sandbox_id:
         # connect() auto-resumes a paused sandbox; callers handle NotFoundException.
         logger.info("[%s] Reconnecting to sandbox %s", request_id, sandbox_id)
@@ -225,42 +365,35 @@ async def run_agent_in_sandbox(
         await sbx.set_timeout(timeout)
         sandbox_started()
 
+        # Independent uploads run concurrently — each is a separate E2B round-trip
+        uploads: list[Awaitable[object]] = [
+            # Write new agent_config with the new prompt
+            sbx.files.write_files(
+                [
+                    {
+                        "path": "/opt/agent-runner/agent_config.json",
+                        "data": config_bytes,
+                    },
+                ]
+            )
+        ]
         # Upload extra skills that aren't already in the sandbox
         extra_skills_to_upload = {k: v for k, v in merged_skills.items() if k not in disk_skills}
         if extra_skills_to_upload:
-            await _upload_skills(sbx, extra_skills_to_upload, request_id)
-
+            uploads.append(_upload_skills(sbx, extra_skills_to_upload, request_id))
         # Upload user files if provided
         if request.files:
-            await _upload_files(sbx, request.files, request_id)
+            uploads.append(_upload_files(sbx, request.files, request_id))
         if binary_files:
-            logger.info("[%s] Uploading %d binary files", request_id, len(binary_files))
-            await sbx.files.write_files(
-                [
-                    {"path": f"/home/user/{path}", "data": data}
-                    for path, data in binary_files.items()
-                ]
-            )
-
-        # Write new agent_config with the new prompt
-        await sbx.files.write_files(
-            [
-                {
-                    "path": "/opt/agent-runner/agent_config.json",
-                    "data": json.dumps(agent_config),
-                },
-            ]
-        )
+            uploads.append(_upload_binary_files(sbx, binary_files, request_id))
+        await asyncio.gather(*uploads)
     else:
         # --- Normal create path ---
         # Build sandbox env vars: API key + any provider env vars from .env
         sandbox_envs: dict[str, str] = {}
         if request.anthropic_api_key:
             sandbox_envs["ANTHROPIC_API_KEY"] = request.anthropic_api_key
-        for key in _PROVIDER_ENV_KEYS:
-            val = os.environ.get(key)
-            if val:
-                sandbox_envs[key] = val
+        sandbox_envs.update(_provider_envs())
 
         # Per-request OpenRouter key overrides env var
         if request.openrouter_api_key:
@@ -277,28 +410,54 @@ async def run_agent_in_sandbox(
         if gcp_creds_content:
             sandbox_envs["GOOGLE_APPLICATION_CREDENTIALS"] = _GCP_CREDENTIALS_SANDBOX_PATH
 
-        sbx = await _create_sandbox(request.e2b_api_key, timeout, sandbox_envs, request_id)
+        # Keep-alive sandboxes are resumed later without envs on the command,
+        # so they must carry envs from creation and can't come from the pool.
+        sbx = None
+        if not keep_alive:
+            sbx = await _acquire_warm_sandbox(request.e2b_api_key, timeout, request_id)
+        if sbx is not None:
+            runner_envs = sandbox_envs
+        else:
+            sbx = await _create_sandbox(request.e2b_api_key, timeout, sandbox_envs, request_id)
         if sandbox_id_out is not None:
             sandbox_id_out.append(sbx.sandbox_id)
 
     try:
         if not sandbox_id:
             # Full setup only needed for fresh sandboxes
-            # Build Claude Agent SDK settings
-            settings: dict = {
-                "permissions": {"allow": [], "deny": []},
-            }
-            if not has_skills:
-                settings["env"] = {"CLAUDE_CODE_DISABLE_EXPERIMENTAL_BETAS": "1"}
+            settings_json = _SETTINGS_JSON if has_skills else _SETTINGS_JSON_NO_BETAS
 
-            # Create all needed directories in a single command
-            dirs = ["/home/user/.claude"]
+            # Batch-write all infrastructure files in a single API call. No mkdir
+            # round-trip first: write_files creates missing parent directories
+            # (/home/user/.claude, the gcloud config dir) itself.
             if gcp_creds_content:
-                dirs.append(posixpath.dirname(_GCP_CREDENTIALS_SANDBOX_PATH))
-            await sbx.commands.run(
-                " && ".join(f"mkdir -p {shlex.quote(d)}" for d in dirs),
-                timeout=5,
-            )
+                logger.info("[%s] Uploading GCP credentials to sandbox", request_id)
+            uploads: list[Awaitable[object]] = [
+                sbx.files.write_files(
+                    [
+                        {
+                            "path": "/home/user/.claude/settings.json",
+                            "data": settings_json,
+                        },
+                        {"path": "/opt/agent-runner/runner.mjs", "data": _RUNNER_SCRIPT},
+                        *(
+                            []
+                            if config_via_env
+                            else [
+                                {
+                                    "path": "/opt/agent-runner/agent_config.json",
+                                    "data": config_bytes,
+                                }
+                            ]
+                        ),
+                        *(
+                            [{"path": _GCP_CREDENTIALS_SANDBOX_PATH, "data": gcp_creds_content}]
+                            if gcp_creds_content
+                            else []
+                        ),
+                    ]
+                )
+            ]
 
             # Upload skills (batch mkdir + batch write)
             # When template_skills is set, disk skills are already baked into the
@@ -307,41 +466,16 @@ async def run_agent_in_sandbox(
             if sandstorm_config.get("template_skills"):
                 skills_to_upload = {k: v for k, v in merged_skills.items() if k not in disk_skills}
             if skills_to_upload:
-                await _upload_skills(sbx, skills_to_upload, request_id)
+                uploads.append(_upload_skills(sbx, skills_to_upload, request_id))
 
             # Upload user files (batch write)
             if request.files:
-                await _upload_files(sbx, request.files, request_id)
+                uploads.append(_upload_files(sbx, request.files, request_id))
             if binary_files:
-                logger.info("[%s] Uploading %d binary files", request_id, len(binary_files))
-                await sbx.files.write_files(
-                    [
-                        {"path": f"/home/user/{path}", "data": data}
-                        for path, data in binary_files.items()
-                    ]
-                )
+                uploads.append(_upload_binary_files(sbx, binary_files, request_id))
 
-            # Batch-write all infrastructure files in a single API call
-            if gcp_creds_content:
-                logger.info("[%s] Uploading GCP credentials to sandbox", request_id)
-            await sbx.files.write_files(
-                [
-                    {
-                        "path": "/home/user/.claude/settings.json",
-                        "data": json.dumps(settings, indent=2),
-                    },
-                    {"path": "/opt/agent-runner/runner.mjs", "data": _RUNNER_SCRIPT},
-                    {
-                        "path": "/opt/agent-runner/agent_config.json",
-                        "data": json.dumps(agent_config),
-                    },
-                    *(
-                        [{"path": _GCP_CREDENTIALS_SANDBOX_PATH, "data": gcp_creds_content}]
-                        if gcp_creds_content
-                        else []
-                    ),
-                ]
-            )
+            # Independent uploads run concurrently — each is a separate E2B round-trip
+            await asyncio.gather(*uploads)
 
         extraction_marker = None
         try:
@@ -358,23 +492,31 @@ async def run_agent_in_sandbox(
         )
 
         def _on_stdout(data):
-            _enqueue(_to_str(data))
+            # Strip here so blank chunks never take up stream buffer slots
+            text = _to_str(data).strip()
+            if text:
+                _enqueue(text)
 
         def _on_stderr(data):
             text = _to_str(data).strip()
             if text:
-                _enqueue(json.dumps({"type": "stderr", "data": text}))
+                _enqueue(orjson.dumps({"type": "stderr", "data": text}).decode())
+
+        command_envs = runner_envs
+        if config_via_env:
+            command_envs = {**(runner_envs or {}), "SANDSTORM_AGENT_CONFIG": config_bytes.decode()}
 
         async def run_command():
             try:
                 await sbx.commands.run(
                     "node /opt/agent-runner/runner.mjs",
+                    envs=command_envs,
                     timeout=_RUNNER_TIMEOUT,
                     on_stdout=_on_stdout,
                     on_stderr=_on_stderr,
                 )
             finally:
-                await queue.put(None)
+                send_stream.close()
 
         agent_start = time.monotonic()
         with get_tracer().start_as_current_span(
@@ -387,19 +529,14 @@ async def run_agent_in_sandbox(
         ):
             task = asyncio.create_task(run_command())
 
-            # Yield messages from queue until the process ends or the run
+            # Yield messages from the stream until the process ends or the run
             # is cancelled. is_cancelled() is an O(1) dict check; cancellation
             # breaks the loop and the finally block tears the sandbox down.
-            while True:
-                line = await queue.get()
-                if line is None:
-                    break
-                line = line.strip()
-                if line:
-                    yield line
+            async for line in recv_stream:
+                yield line
                 if is_cancelled(request_id):
                     logger.info("[%s] Cancellation received — stopping stream", request_id)
-                    yield json.dumps({"type": "error", "error": "cancelled by user"})
+                    yield orjson.dumps({"type": "error", "error": "cancelled by user"}).decode()
                     break
 
             record_agent_execution(
@@ -451,3 +588,5 @@ async def run_agent_in_sandbox(
                     await sbx.kill()
         else:
             await _cleanup(task, sbx, request_id)
+        send_stream.close()
+        recv_stream.close()
@@ -9,8 +9,8 @@ import json
 import logging
 import os
 import re
+import secrets
 import time
-import uuid
 from collections.abc import Callable
 from typing import TYPE_CHECKING
 
@@ -686,7 +686,7 @@ def create_slack_app(
                 if existing_sandbox_id:
                     # Fresh run_id for the retry — the failed reuse attempt
                     # already recorded its own run entry and Slack message.
-                    run_id = uuid.uuid4().hex[:8]
+                    run_id = secrets.token_hex(4)
 
                 streamer = await client.chat_stream(
                     channel=channel,
@@ -742,7 +742,7 @@ def create_slack_app(
         with contextlib.suppress(Exception):
             await client.reactions_add(channel=channel, timestamp=event["ts"], name="eyes")
 
-        run_id = uuid.uuid4().hex[:8]
+        run_id = secrets.token_hex(4)
         tenant = context.get("enterprise_id") or context.get("team_id")
         request, binary_files = await _prepare_prompt(
             client,
@@ -821,7 +821,7 @@ def create_slack_app(
             )
         except TypeError:
             await set_status("Spinning up sandbox...")
-        run_id = uuid.uuid4().hex[:8]
+        run_id = secrets.token_hex(4)
         tenant = context.get("enterprise_id") or context.get("team_id")
         request, binary_files = await _prepare_prompt(
             client,
@@ -1174,7 +1174,7 @@ def create_slack_app(
                 channel={"id": channel},
                 reaction=emoji,
             )
-            run_id = uuid.uuid4().hex[:8]
+            run_id = secrets.token_hex(4)
             request = _build_query_request(rendered, None, team_id=tenant, user_id=user_id)
             thread_ts = message.get("thread_ts") or ts
             try:
@@ -27,6 +27,9 @@ class _NoOpSpan:
     def set_attribute(self, key, value):
         pass
 
+    def set_attributes(self, attributes):
+        pass
+
     def set_status(self, status, description=None):
         pass
 
@@ -46,6 +49,7 @@ class _NoOpTracer:
 _ENABLED = False
 
 _tracer = None  # Real tracer when enabled
+_fallback_tracer = None  # Cached no-op/proxy tracer returned while disabled
 _request_counter = None
 _request_duration = None
 _sandbox_creation_duration = None
@@ -215,15 +219,23 @@ def init(app: FastAPI | None = None) -> None:
 
 
 def get_tracer():
-    """Return the real tracer when enabled, OTel no-op tracer otherwise."""
+    """Return the real tracer when enabled, OTel no-op tracer otherwise.
+
+    The fallback is resolved once: without the OTel packages every lookup
+    would otherwise repeat a failing import on each span.
+    """
+    global _fallback_tracer  # noqa: PLW0603
+
     if _tracer is not None:
         return _tracer
-    try:
-        from opentelemetry import trace  # type: ignore[reportMissingImports]
+    if _fallback_tracer is None:
+        try:
+            from opentelemetry import trace  # type: ignore[reportMissingImports]
 
-        return trace.get_tracer("sandstorm")
-    except ImportError:
-        return _NoOpTracer()
+            _fallback_tracer = trace.get_tracer("sandstorm")
+        except ImportError:
+            _fallback_tracer = _NoOpTracer()
+    return _fallback_tracer
 
 
 # ── Span error helper ──────────────────────────────────────────────────────
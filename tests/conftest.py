@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -55,10 +55,13 @@ def mock_sandbox():
         yield '{"type": "output", "output": "test output"}'
         yield '{"type": "status", "status": "completed"}'
 
-    with patch(
-        "sandstorm.sandbox.run_agent_in_sandbox",
-        side_effect=_mock_generator,
-    ) as mock:
+    with (
+        patch(
+            "sandstorm.sandbox.run_agent_in_sandbox",
+            side_effect=_mock_generator,
+        ) as mock,
+        patch("sandstorm.main.probe_template", new=AsyncMock()),
+    ):
         yield mock
 
 
@@ -207,6 +207,17 @@ class TestEdgeCases:
         )
         assert response.status_code == 401
 
+    def test_non_ascii_token_returns_401(self, client):
+        """Non-ASCII tokens are rejected, not a 500 from compare_digest."""
+        response = client.post(
+            "/query",
+            headers={
+                "Authorization": "Bearer t\u00f6ken-12345678901234567890abcdef".encode("latin-1")
+            },
+            json={"prompt": "test"},
+        )
+        assert response.status_code == 401
+
     def test_previous_key_too_short_is_ignored(self, monkeypatch, valid_token):
         """SANDSTORM_API_KEY_PREVIOUS shorter than 32 chars is silently ignored."""
         monkeypatch.setenv("SANDSTORM_API_KEY", valid_token)
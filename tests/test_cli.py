@@ -1,5 +1,7 @@
 import json
+import sys
 import time
+import types
 from pathlib import Path
 
 import pytest
@@ -115,6 +117,31 @@ class TestCli:
         assert result.exit_code == 0
         assert seen["files"] == {"src/main.py": "print('hi')"}
 
+    def test_query_uploads_utf8_bytes_verbatim(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test-key")
+        monkeypatch.setenv("E2B_API_KEY", "e2b-test-key")
+
+        text_file = tmp_path / "notes.txt"
+        text_file.write_bytes("caf\u00e9\r\nline 2\n".encode())
+
+        seen = {}
+
+        async def _capture_request(request, request_id):
+            seen["files"] = request.files
+            async for line in _make_fake_run_agent_in_sandbox(seen)(request, request_id):
+                yield line
+
+        import sandstorm.sandbox as sandbox
+
+        monkeypatch.setattr(sandbox, "run_agent_in_sandbox", _capture_request)
+        monkeypatch.chdir(tmp_path)
+
+        result = CliRunner().invoke(cli, ["query", "inspect", "-f", str(text_file)])
+
+        assert result.exit_code == 0
+        # CRLF is preserved and decoding doesn't depend on the locale codec
+        assert seen["files"] == {"notes.txt": "caf\u00e9\r\nline 2\n"}
+
     def test_query_reports_missing_mcp_env_vars(self, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
         _disable_dotenv(monkeypatch)
@@ -874,6 +901,105 @@ class TestCli:
         assert result.exit_code == 1
         assert "URL must use http:// or https://" in result.output
 
+    def test_webhook_delete_multiple_ids_reports_each(self, monkeypatch):
+        import sandstorm.e2b_api as e2b_api
+
+        _disable_dotenv(monkeypatch)
+        monkeypatch.setenv("E2B_API_KEY", "e2b-test-key")
+        seen = {}
+
+        async def _fake_concurrent(calls, api_key):
+            seen["calls"] = calls
+            return [None, e2b_api.E2BApiError("E2B API returned 404: gone", 404)]
+
+        monkeypatch.setattr(e2b_api, "webhook_requests_concurrent", _fake_concurrent)
+
+        result = CliRunner().invoke(cli, ["webhook", "delete", "wh-1", "wh-2"])
+
+        assert result.exit_code == 1
+        assert seen["calls"] == [("DELETE", "/wh-1"), ("DELETE", "/wh-2")]
+        assert "Webhook wh-1 deleted." in result.output
+        assert "Error deleting wh-2" in result.output
+
+
+class TestEntryPoint:
+    def test_version_fast_path_matches_click(self, monkeypatch, capsys):
+        from sandstorm.__main__ import main
+
+        click_output = CliRunner().invoke(cli, ["--version"]).output
+
+        monkeypatch.setattr("sys.argv", ["ds", "--version"])
+        main()
+
+        assert capsys.readouterr().out == click_output
+
+    def test_cli_import_skips_pydantic(self):
+        import subprocess
+        import sys
+
+        code = "import sys, sandstorm.cli; print('pydantic' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "False"
+
+
+class TestSlackSetup:
+    @pytest.mark.parametrize("bot_token", ["xoxb-", "xoxb-short", "xoxb-has space-123456"])
+    def test_rejects_malformed_bot_token(self, bot_token, monkeypatch):
+        import webbrowser
+
+        _disable_dotenv(monkeypatch)
+        monkeypatch.setattr(webbrowser, "open", lambda url: True)
+
+        result = CliRunner().invoke(cli, ["slack", "setup"], input=f"{bot_token}\n")
+
+        assert result.exit_code == 1
+        assert "Bot token should look like 'xoxb-...'" in result.output
+
+
+class TestPrintEvent:
+    def test_assistant_blocks_split_by_stream(self, capsys):
+        content = [
+            {"type": "text", "text": "Hello "},
+            {"type": "tool_use", "name": "Bash"},
+            {"type": "text", "text": "world"},
+            {"type": "tool_use"},
+        ]
+        cli_module._print_event(json.dumps({"type": "assistant", "message": {"content": content}}))
+        out, err = capsys.readouterr()
+        assert out == "Hello world"
+        assert err == "[tool: Bash][tool: unknown]"
+
+    def test_assistant_writes_keep_block_order(self, monkeypatch):
+        writes: list[tuple[str, bool]] = []
+        monkeypatch.setattr(
+            cli_module.click, "echo", lambda msg, nl, err=False: writes.append((msg, err))
+        )
+        content = [
+            {"type": "text", "text": "Let me "},
+            {"type": "text", "text": "check. "},
+            {"type": "tool_use", "name": "Read"},
+            {"type": "tool_use", "name": "Bash"},
+            {"type": "text", "text": "Done."},
+        ]
+        cli_module._print_event(json.dumps({"type": "assistant", "message": {"content": content}}))
+        # Consecutive same-stream blocks share one write; order is preserved
+        assert writes == [
+            ("Let me check. ", False),
+            ("[tool: Read][tool: Bash]", True),
+            ("Done.", False),
+        ]
+
+    def test_non_json_line_echoed_verbatim(self, capsys):
+        cli_module._print_event("plain text")
+        assert capsys.readouterr().out == "plain text"
+
+    @pytest.mark.parametrize("line", ["42", '"quoted"', "[1, 2]", "{not json"])
+    def test_non_object_lines_echoed_verbatim(self, capsys, line):
+        cli_module._print_event(line)
+        assert capsys.readouterr().out == line
+
 
 class TestUpgrade:
     def test_upgrade_already_at_latest(self, monkeypatch):
@@ -1015,3 +1141,15 @@ class TestReplay:
         assert "Replay report" in result.output
         assert "orig-1" in result.output
         assert "claude-haiku-4-5-20251001" in result.output
+
+
+def test_run_async_falls_back_when_uvloop_lacks_run(monkeypatch):
+    # uvloop < 0.18 has no run(); the coroutine must still run on asyncio
+    monkeypatch.setitem(sys.modules, "uvloop", types.ModuleType("uvloop"))
+    ran: list[bool] = []
+
+    async def _coro() -> None:
+        ran.append(True)
+
+    cli_module._run_async(_coro())
+    assert ran == [True]
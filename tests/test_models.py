@@ -95,7 +95,7 @@ class TestFileValidation:
 
     def test_too_many_files_rejected(self):
         files = {f"file{i}.txt": "content" for i in range(21)}
-        with pytest.raises(ValidationError, match="Too many files"):
+        with pytest.raises(ValidationError, match="at most 20 items"):
             QueryRequest(prompt="test", files=files)
 
     def test_total_size_limit_exceeded(self):
@@ -104,6 +104,11 @@ class TestFileValidation:
         with pytest.raises(ValidationError, match="exceeds 10MB limit"):
             QueryRequest(prompt="test", files={"big.txt": big_content})
 
+    def test_total_size_limit_spans_files(self):
+        files = {f"part{i}.txt": "x" * 4_000_000 for i in range(3)}
+        with pytest.raises(ValidationError, match="exceeds 10MB limit"):
+            QueryRequest(prompt="test", files=files)
+
     def test_valid_files_accepted(self):
         req = QueryRequest(
             prompt="test",
@@ -112,6 +117,15 @@ class TestFileValidation:
         assert "hello.py" in req.files
         assert "sub/dir/file.txt" in req.files
 
+    def test_total_size_counts_utf8_bytes(self):
+        # 3.4M chars, but each is 3 bytes in UTF-8
+        with pytest.raises(ValidationError, match="exceeds 10MB limit"):
+            QueryRequest(prompt="test", files={"big.txt": "\u20ac" * 3_400_000})
+
+    def test_non_canonical_paths_normalized(self):
+        req = QueryRequest(prompt="test", files={"./a/../b.txt": "x", "c.txt": "y"})
+        assert req.files == {"b.txt": "x", "c.txt": "y"}
+
 
 class TestWhitelistFields:
     def test_defaults_to_none(self):
@@ -157,13 +171,17 @@ class TestWhitelistFields:
         assert req.extra_skills == {"my-skill": "# Skill content", "skill_2": "content"}
 
     def test_extra_skills_rejects_invalid_names(self):
-        with pytest.raises(ValidationError, match="Invalid skill name"):
+        with pytest.raises(ValidationError, match="should match pattern"):
             QueryRequest(prompt="test", extra_skills={"bad name!": "content"})
 
     def test_extra_skills_rejects_dotted_names(self):
-        with pytest.raises(ValidationError, match="Invalid skill name"):
+        with pytest.raises(ValidationError, match="should match pattern"):
             QueryRequest(prompt="test", extra_skills={"path..traversal": "content"})
 
+    def test_extra_skills_rejects_trailing_newline(self):
+        with pytest.raises(ValidationError, match="should match pattern"):
+            QueryRequest(prompt="test", extra_skills={"skill\n": "content"})
+
     def test_extra_agents_accepts_valid_names(self):
         req = QueryRequest(
             prompt="test",
@@ -173,7 +191,7 @@ class TestWhitelistFields:
         assert "my-agent_2" in req.extra_agents
 
     def test_extra_agents_rejects_invalid_names(self):
-        with pytest.raises(ValidationError, match="Invalid agent name"):
+        with pytest.raises(ValidationError, match="should match pattern"):
             QueryRequest(prompt="test", extra_agents={"bad name!": {"model": "haiku"}})
 
 
@@ -0,0 +1,186 @@
+"""Tests for the warm sandbox pool."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from unittest.mock import AsyncMock, MagicMock
+
+import sandstorm.pool as pool_mod
+import sandstorm.sandbox as sandbox_mod
+from sandstorm.pool import WarmPool
+
+
+def _factory():
+    created: list[MagicMock] = []
+
+    async def _create():
+        sbx = MagicMock()
+        sbx.sandbox_id = f"sbx-{len(created)}"
+        sbx.kill = AsyncMock()
+        sbx.set_timeout = AsyncMock()
+        created.append(sbx)
+        return sbx
+
+    return created, _create
+
+
+class TestWarmPool:
+    def test_fill_creates_up_to_size(self):
+        created, factory = _factory()
+
+        async def _go() -> None:
+            pool = WarmPool(2, "key", factory)
+            pool.fill()
+            pool.fill()  # in-flight creations count toward size
+            await asyncio.sleep(0)
+            assert len(created) == 2
+            await pool.close()
+
+        asyncio.run(_go())
+
+    def test_acquire_returns_idle_and_refills(self):
+        created, factory = _factory()
+
+        async def _go() -> None:
+            pool = WarmPool(1, "key", factory)
+            pool.fill()
+            await asyncio.sleep(0)
+            assert pool.acquire() is created[0]
+            await asyncio.sleep(0)
+            assert len(created) == 2
+            await pool.close()
+
+        asyncio.run(_go())
+
+    def test_acquire_empty_returns_none(self):
+        _, factory = _factory()
+
+        async def _go() -> None:
+            pool = WarmPool(1, "key", factory)
+            assert pool.acquire() is None
+            await pool.close()
+
+        asyncio.run(_go())
+
+    def test_acquire_discards_expired(self, monkeypatch):
+        created, factory = _factory()
+
+        async def _go() -> None:
+            pool = WarmPool(1, "key", factory)
+            pool.fill()
+            await asyncio.sleep(0)
+            monkeypatch.setattr(pool_mod, "POOL_SANDBOX_TIMEOUT", 0)
+            assert pool.acquire() is None
+            await pool.close()
+            created[0].kill.assert_awaited_once()
+
+        asyncio.run(_go())
+
+    def test_failed_creation_is_not_pooled(self):
+        async def _go() -> None:
+            pool = WarmPool(1, "key", AsyncMock(side_effect=RuntimeError("boom")))
+            pool.fill()
+            await asyncio.sleep(0)
+            assert pool.acquire() is None
+            await pool.close()
+
+        asyncio.run(_go())
+
+    def test_close_kills_idle(self):
+        created, factory = _factory()
+
+        async def _go() -> None:
+            pool = WarmPool(2, "key", factory)
+            pool.fill()
+            await asyncio.sleep(0)
+            await pool.close()
+            assert pool.acquire() is None
+
+        asyncio.run(_go())
+        for sbx in created:
+            sbx.kill.assert_awaited_once()
+
+    def test_refresher_replaces_near_expiry_sandboxes(self, monkeypatch):
+        created, factory = _factory()
+        monkeypatch.setattr(pool_mod, "_REFRESH_INTERVAL", 0.01)
+
+        async def _go() -> None:
+            pool = WarmPool(1, "key", factory)
+            pool.start()
+            await asyncio.sleep(0)
+            # Age the idle sandbox past the expiry margin without any checkout
+            created_at, sbx = pool._idle[0]
+            pool._idle[0] = (created_at - pool_mod.POOL_SANDBOX_TIMEOUT, sbx)
+            await asyncio.sleep(0.05)
+            created[0].kill.assert_awaited_once()
+            assert [s for _, s in pool._idle] == [created[1]]
+            await pool.close()
+
+        asyncio.run(_go())
+
+    def test_refresher_retries_failed_creation(self, monkeypatch):
+        monkeypatch.setattr(pool_mod, "_REFRESH_INTERVAL", 0.01)
+        sbx = MagicMock()
+        sbx.kill = AsyncMock()
+        factory = AsyncMock(side_effect=[RuntimeError("boom"), sbx])
+
+        async def _go() -> None:
+            pool = WarmPool(1, "key", factory)
+            pool.start()
+            await asyncio.sleep(0.05)
+            assert pool.acquire() is sbx
+            await pool.close()
+
+        asyncio.run(_go())
+
+    def test_close_waits_for_inflight_creation_and_kills_it(self):
+        sbx = MagicMock()
+        sbx.kill = AsyncMock()
+
+        async def _slow_create():
+            await asyncio.sleep(0.02)
+            return sbx
+
+        async def _go() -> None:
+            pool = WarmPool(1, "key", _slow_create)
+            pool.fill()
+            await asyncio.sleep(0)
+            await pool.close()
+
+        asyncio.run(_go())
+        sbx.kill.assert_awaited_once()
+
+    def test_close_cancels_creation_after_wait(self, monkeypatch):
+        monkeypatch.setattr(pool_mod, "_CLOSE_CREATE_WAIT", 0.01)
+        started = []
+
+        async def _hung_create():
+            started.append(True)
+            await asyncio.sleep(10)
+
+        async def _go() -> None:
+            pool = WarmPool(1, "key", _hung_create)
+            pool.fill()
+            await asyncio.sleep(0)
+            await asyncio.wait_for(pool.close(), timeout=1)
+
+        asyncio.run(_go())
+        assert started == [True]
+
+    def test_acquire_warm_sandbox_records_request_id(self, monkeypatch):
+        created, factory = _factory()
+
+        async def _go() -> None:
+            pool = WarmPool(1, "key", factory)
+            monkeypatch.setattr(sandbox_mod, "_warm_pool", pool)
+            pool.fill()
+            await asyncio.sleep(0)
+            sbx = await sandbox_mod._acquire_warm_sandbox("key", 300, "req-1")
+            assert sbx is created[0]
+            await pool.close()
+
+        monkeypatch.setattr(sandbox_mod, "_warm_request_ids", OrderedDict())
+        asyncio.run(_go())
+        created[0].set_timeout.assert_awaited_once_with(300)
+        assert sandbox_mod.warm_sandbox_request_id("sbx-0") == "req-1"
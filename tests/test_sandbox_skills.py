@@ -3,12 +3,12 @@ import base64
 import json
 import logging
 import os
-from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 import sandstorm.config as config_mod
+import sandstorm.sandbox as sandbox_mod
 from sandstorm.config import (
     _PROVIDER_ENV_KEYS,
     _build_agent_config,
@@ -29,6 +29,20 @@ class TestValidateSandstormConfigSkills:
     def test_provider_env_keys_keep_linear_api_key(self):
         assert "LINEAR_API_KEY" in _PROVIDER_ENV_KEYS
 
+    def test_provider_envs_snapshot_refreshes_on_dotenv_reload(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("LINEAR_API_KEY", raising=False)
+        monkeypatch.setattr(config_mod, "_provider_envs_cache", None)
+        env_path = tmp_path / ".env"
+
+        env_path.write_text("LINEAR_API_KEY=old-key\n", encoding="utf-8")
+        config_mod._refresh_project_dotenv()
+        assert config_mod._provider_envs()["LINEAR_API_KEY"] == "old-key"
+
+        env_path.write_text("LINEAR_API_KEY=new-key\n", encoding="utf-8")
+        config_mod._refresh_project_dotenv()
+        assert config_mod._provider_envs()["LINEAR_API_KEY"] == "new-key"
+
     def test_allowed_tools_valid(self):
         config = _validate_sandstorm_config({"allowed_tools": ["Skill", "Read", "Bash"]})
         assert config["allowed_tools"] == ["Skill", "Read", "Bash"]
@@ -106,21 +120,26 @@ class TestValidateSandstormConfigSkills:
 
     def test_load_sandstorm_config_reads_utf8(self, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
-        (tmp_path / "sandstorm.json").write_text('{"model":"sonnet"}', encoding="utf-8")
+        # Non-ASCII bytes must decode as UTF-8 regardless of the locale encoding
+        (tmp_path / "sandstorm.json").write_text('{"model":"sonnet-\u00e9"}', encoding="utf-8")
         monkeypatch.setattr(config_mod, "_config_cache", None)
         monkeypatch.setattr(config_mod, "_config_mtime", 0.0)
 
-        original_read_text = Path.read_text
-        seen: dict[str, str | None] = {}
+        assert load_sandstorm_config() == {"model": "sonnet-\u00e9"}
 
-        def _read_text(self, *args, **kwargs):
-            seen["encoding"] = kwargs.get("encoding")
-            return original_read_text(self, *args, **kwargs)
+    def test_load_sandstorm_config_cached_until_removed(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config_path = tmp_path / "sandstorm.json"
+        config_path.write_text('{"model":"sonnet"}', encoding="utf-8")
+        monkeypatch.setattr(config_mod, "_config_cache", None)
+        monkeypatch.setattr(config_mod, "_config_mtime", 0.0)
 
-        monkeypatch.setattr(Path, "read_text", _read_text)
+        first = load_sandstorm_config()
+        assert load_sandstorm_config() is first
 
-        assert load_sandstorm_config() == {"model": "sonnet"}
-        assert seen["encoding"] == "utf-8"
+        config_path.unlink()
+        assert load_sandstorm_config() is None
+        assert config_mod._config_cache is None
 
 
 class TestLoadSkillsDir:
@@ -882,3 +901,156 @@ class TestExtractGeneratedFiles:
         assert f"-cnewer {self._MARKER}" in scan_cmd
         assert f"head -n {_MAX_EXTRACT_FILES + 1}" in scan_cmd
         sbx.files.list.assert_not_called()
+
+
+class TestCreateSandboxTemplateProbe:
+    def _create(self, monkeypatch):
+        sbx = MagicMock()
+        sbx.sandbox_id = "sbx-1"
+        sbx.commands.run = AsyncMock()
+        create = AsyncMock(return_value=sbx)
+        monkeypatch.setattr(sandbox_mod.AsyncSandbox, "create", create)
+        return create
+
+    def test_probe_miss_skips_custom_template(self, monkeypatch):
+        monkeypatch.setenv("E2B_API_KEY", "e2b-test-key")
+        monkeypatch.setattr(sandbox_mod, "_template_available", None)
+        monkeypatch.setattr(sandbox_mod.AsyncTemplate, "exists", AsyncMock(return_value=False))
+        create = self._create(monkeypatch)
+
+        asyncio.run(sandbox_mod.probe_template())
+        asyncio.run(sandbox_mod._create_sandbox("key", 60, {}, "req1"))
+
+        create.assert_awaited_once()
+        assert create.await_args.kwargs["template"] == sandbox_mod.FALLBACK_TEMPLATE
+
+    def test_unknown_availability_falls_back_on_not_found(self, monkeypatch):
+        monkeypatch.setattr(sandbox_mod, "_template_available", None)
+        create = self._create(monkeypatch)
+        sbx = create.return_value
+        create.side_effect = [sandbox_mod.NotFoundException("missing"), sbx]
+
+        asyncio.run(sandbox_mod._create_sandbox("key", 60, {}, "req1"))
+
+        templates = [c.kwargs["template"] for c in create.await_args_list]
+        assert templates == [sandbox_mod.TEMPLATE, sandbox_mod.FALLBACK_TEMPLATE]
+
+
+_RUNNER_CMD = "node /opt/agent-runner/runner.mjs"
+_CONFIG_PATH = "/opt/agent-runner/agent_config.json"
+
+
+def _fake_sandbox() -> MagicMock:
+    sbx = MagicMock()
+    sbx.sandbox_id = "sbx-1"
+    sbx.files.write_files = AsyncMock()
+    sbx.commands.run = AsyncMock(return_value=MagicMock(stdout="", exit_code=0))
+    sbx.set_timeout = AsyncMock()
+    sbx.kill = AsyncMock()
+    sbx.pause = AsyncMock()
+    return sbx
+
+
+def _runner_envs(sbx: MagicMock) -> dict[str, str] | None:
+    """Return the envs passed to the runner command."""
+    (call,) = [c for c in sbx.commands.run.await_args_list if c.args[0] == _RUNNER_CMD]
+    return call.kwargs["envs"]
+
+
+def _written_paths(sbx: MagicMock) -> list[str]:
+    return [f["path"] for c in sbx.files.write_files.await_args_list for f in c.args[0]]
+
+
+def _run_agent(request: QueryRequest, **kwargs) -> None:
+    async def _go() -> None:
+        async for _ in sandbox_mod.run_agent_in_sandbox(request, "req-1", **kwargs):
+            pass
+
+    asyncio.run(_go())
+
+
+@pytest.fixture
+def agent_env(tmp_path, monkeypatch):
+    """Run from an empty project with no GCP credentials or provider envs."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CLAUDE_CODE_USE_VERTEX", raising=False)
+    monkeypatch.delenv("GOOGLE_APPLICATION_CREDENTIALS", raising=False)
+    monkeypatch.setattr(sandbox_mod, "_provider_envs", dict)
+    monkeypatch.setattr(sandbox_mod, "_warm_pool", None)
+
+
+class TestAgentConfigDelivery:
+    def test_fresh_sandbox_gets_small_config_via_env(self, agent_env, monkeypatch):
+        sbx = _fake_sandbox()
+        monkeypatch.setattr(sandbox_mod, "_create_sandbox", AsyncMock(return_value=sbx))
+
+        _run_agent(QueryRequest(prompt="hi", anthropic_api_key="sk-test", e2b_api_key="e2b"))
+
+        config = json.loads(_runner_envs(sbx)["SANDSTORM_AGENT_CONFIG"])
+        assert config["prompt"] == "hi"
+        assert _CONFIG_PATH not in _written_paths(sbx)
+
+    def test_large_config_written_to_file(self, agent_env, monkeypatch):
+        sbx = _fake_sandbox()
+        monkeypatch.setattr(sandbox_mod, "_create_sandbox", AsyncMock(return_value=sbx))
+        prompt = "x" * (sandbox_mod._CONFIG_ENV_MAX_BYTES + 1)
+
+        _run_agent(QueryRequest(prompt=prompt, anthropic_api_key="sk-test", e2b_api_key="e2b"))
+
+        assert "SANDSTORM_AGENT_CONFIG" not in (_runner_envs(sbx) or {})
+        assert _CONFIG_PATH in _written_paths(sbx)
+
+    def test_reconnect_always_writes_config_file(self, agent_env, monkeypatch):
+        sbx = _fake_sandbox()
+        connect = AsyncMock(return_value=sbx)
+        monkeypatch.setattr(sandbox_mod.AsyncSandbox, "connect", connect)
+
+        _run_agent(
+            QueryRequest(prompt="hi", anthropic_api_key="sk-test", e2b_api_key="e2b"),
+            sandbox_id="sbx-1",
+            keep_alive=True,
+        )
+
+        connect.assert_awaited_once()
+        assert "SANDSTORM_AGENT_CONFIG" not in (_runner_envs(sbx) or {})
+        assert _CONFIG_PATH in _written_paths(sbx)
+
+
+class TestWarmPoolRun:
+    def test_pooled_sandbox_gets_envs_on_runner_command(self, agent_env, tmp_path, monkeypatch):
+        sbx = _fake_sandbox()
+        acquire = AsyncMock(return_value=sbx)
+        create = AsyncMock()
+        monkeypatch.setattr(sandbox_mod, "_acquire_warm_sandbox", acquire)
+        monkeypatch.setattr(sandbox_mod, "_create_sandbox", create)
+        monkeypatch.setattr(sandbox_mod, "_provider_envs", lambda: {"LINEAR_API_KEY": "lin"})
+        (tmp_path / "sa.json").write_text("{}", encoding="utf-8")
+        monkeypatch.setenv("CLAUDE_CODE_USE_VERTEX", "1")
+        monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", str(tmp_path / "sa.json"))
+
+        _run_agent(QueryRequest(prompt="hi", anthropic_api_key="sk-test", e2b_api_key="e2b"))
+
+        acquire.assert_awaited_once()
+        create.assert_not_called()
+        envs = _runner_envs(sbx)
+        assert envs["ANTHROPIC_API_KEY"] == "sk-test"
+        assert envs["LINEAR_API_KEY"] == "lin"
+        assert envs["GOOGLE_APPLICATION_CREDENTIALS"] == sandbox_mod._GCP_CREDENTIALS_SANDBOX_PATH
+        assert sandbox_mod._GCP_CREDENTIALS_SANDBOX_PATH in _written_paths(sbx)
+
+    def test_keep_alive_never_uses_pool(self, agent_env, monkeypatch):
+        sbx = _fake_sandbox()
+        acquire = AsyncMock(return_value=_fake_sandbox())
+        create = AsyncMock(return_value=sbx)
+        monkeypatch.setattr(sandbox_mod, "_acquire_warm_sandbox", acquire)
+        monkeypatch.setattr(sandbox_mod, "_create_sandbox", create)
+
+        _run_agent(
+            QueryRequest(prompt="hi", anthropic_api_key="sk-test", e2b_api_key="e2b"),
+            keep_alive=True,
+        )
+
+        acquire.assert_not_called()
+        # Envs are baked in at creation so a resumed sandbox still has them
+        assert create.await_args.args[2]["ANTHROPIC_API_KEY"] == "sk-test"
+        sbx.pause.assert_awaited_once()
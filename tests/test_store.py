@@ -3,6 +3,8 @@
 import json
 import os
 
+import pytest
+
 from sandstorm.store import Run, RunStore
 
 
@@ -386,3 +388,61 @@ class TestRunsEndpoint:
             assert data[1]["id"] == "test-1"
             assert data[1]["status"] == "completed"
             assert data[1]["cost_usd"] == 0.05
+
+
+class TestQueryRecordsRunMetadata:
+    @pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")], ids=["compact", "spaced"])
+    def test_query_records_result_and_init_metadata(self, tmp_path, test_env_no_auth, separators):
+        """The /query metadata peek must catch system init and result lines in any spacing."""
+        from unittest.mock import AsyncMock, patch
+
+        from fastapi.testclient import TestClient
+
+        from sandstorm.main import app
+
+        def dumps(obj: dict) -> str:
+            return json.dumps(obj, separators=separators)
+
+        lines = [
+            dumps(
+                {
+                    "type": "system",
+                    "subtype": "init",
+                    "model": "claude-sonnet-4-20250514",
+                    "session_id": "sess-1",
+                }
+            ),
+            dumps({"type": "assistant", "message": {"content": [{"type": "text"}]}}),
+            '["result", "system"]',
+            '{"type": "result", truncated',
+            "plain text mentioning result",
+            dumps({"type": "result", "total_cost_usd": 0.12, "num_turns": 3}),
+        ]
+
+        async def _fake_run(*args, **kwargs):
+            for line in lines:
+                yield line
+
+        test_store = RunStore(path=tmp_path / "runs.jsonl")
+        with (
+            patch("sandstorm.main.run_store", test_store),
+            patch("sandstorm.main.run_agent_in_sandbox", _fake_run),
+            patch("sandstorm.main.probe_template", new=AsyncMock()),
+            TestClient(app) as client,
+        ):
+            response = client.post("/query", json={"prompt": "hi"})
+
+        assert response.status_code == 200
+        events = [
+            line.removeprefix("data: ")
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        # Every line is forwarded, including non-object and malformed ones
+        assert events == lines
+        (run,) = test_store.list()
+        assert run["status"] == "completed"
+        assert run["cost_usd"] == 0.12
+        assert run["num_turns"] == 3
+        assert run["model"] == "claude-sonnet-4-20250514"
+        assert run["agent_session_id"] == "sess-1"
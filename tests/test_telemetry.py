@@ -19,6 +19,7 @@ def _reset_telemetry(monkeypatch):
     # Reset module-level state
     monkeypatch.setattr(telemetry_mod, "_ENABLED", False)
     monkeypatch.setattr(telemetry_mod, "_tracer", None)
+    monkeypatch.setattr(telemetry_mod, "_fallback_tracer", None)
     monkeypatch.setattr(telemetry_mod, "_request_counter", None)
     monkeypatch.setattr(telemetry_mod, "_request_duration", None)
     monkeypatch.setattr(telemetry_mod, "_sandbox_creation_duration", None)
@@ -53,6 +54,33 @@ class TestDisabledState:
         with tracer.start_as_current_span("test") as span:
             assert not span.is_recording()
 
+    def test_get_tracer_caches_fallback(self):
+        assert telemetry_mod.get_tracer() is telemetry_mod.get_tracer()
+
+    def test_get_tracer_without_otel_returns_cached_noop(self, monkeypatch):
+        import builtins
+
+        real_import = builtins.__import__
+        attempts = []
+
+        def _no_otel(name, *args, **kwargs):
+            if name.startswith("opentelemetry"):
+                attempts.append(name)
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", _no_otel)
+        first = telemetry_mod.get_tracer()
+        assert isinstance(first, telemetry_mod._NoOpTracer)
+        assert telemetry_mod.get_tracer() is first
+        assert len(attempts) == 1
+
+    def test_noop_tracer_spans_accept_attributes(self):
+        with telemetry_mod._NoOpTracer().start_as_current_span("test") as span:
+            span.set_attribute("a", 1)
+            span.set_attributes({"b": 2, "c": "x"})
+            assert not span.is_recording()
+
     def test_set_span_error_is_noop(self):
         tracer = telemetry_mod.get_tracer()
         with tracer.start_as_current_span("test") as span:
@@ -3,10 +3,15 @@
 import hashlib
 import hmac
 import json
+import logging
+import threading
+from collections import OrderedDict
 
+import pytest
 from fastapi.testclient import TestClient
 
 import sandstorm.main as main_mod
+import sandstorm.sandbox as sandbox_mod
 from sandstorm.main import app
 
 client = TestClient(app)
@@ -28,6 +33,26 @@ class TestWebhookEndpoint:
         assert response.status_code == 400
         assert "invalid JSON" in response.json()["error"]
 
+    @pytest.mark.parametrize("event_data", [None, "oops", {"sandbox_metadata": ["x"]}])
+    def test_webhook_tolerates_malformed_event_data(self, event_data):
+        payload = {"type": "sandbox.lifecycle.killed", "sandboxId": "abc", "eventData": event_data}
+        response = client.post("/webhooks/e2b", json=payload)
+        assert response.status_code == 200
+
+    def test_webhook_resolves_warm_pool_request_id(self, monkeypatch, caplog):
+        monkeypatch.setattr(sandbox_mod, "_warm_request_ids", OrderedDict({"sbx-1": "req-42"}))
+        event_data = {"sandbox_metadata": {"request_id": "warm-pool"}}
+
+        with caplog.at_level(logging.INFO, logger="sandstorm.main"):
+            payload = {"type": "sandbox.lifecycle.paused", "sandboxId": "sbx-1"}
+            client.post("/webhooks/e2b", json={**payload, "eventData": event_data})
+            payload = {"type": "sandbox.lifecycle.killed", "sandboxId": "sbx-1"}
+            client.post("/webhooks/e2b", json={**payload, "eventData": event_data})
+
+        assert [r.getMessage().startswith("[req-42]") for r in caplog.records] == [True, True]
+        # Forgotten once the sandbox is killed
+        assert sandbox_mod.warm_sandbox_request_id("sbx-1") is None
+
     def test_webhook_invalid_signature(self, monkeypatch):
         monkeypatch.setattr(main_mod, "_WEBHOOK_SECRET", "testsecret")
         payload = {"type": "sandbox.lifecycle.created", "sandboxId": "abc"}
@@ -55,6 +80,34 @@ class TestWebhookEndpoint:
         assert response.status_code == 200
         assert response.json() == {"status": "ok"}
 
+    def test_webhook_signature_follows_secret_change(self, monkeypatch):
+        body = json.dumps({"type": "sandbox.lifecycle.created", "sandboxId": "abc"}).encode()
+        for secret in ("first-secret", "second-secret"):
+            monkeypatch.setattr(main_mod, "_WEBHOOK_SECRET", secret)
+            sig = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+            response = client.post(
+                "/webhooks/e2b",
+                content=body,
+                headers={"Content-Type": "application/json", "e2b-signature": sig},
+            )
+            assert response.status_code == 200
+
+    def test_webhook_large_body_verified_off_loop(self, monkeypatch):
+        secret = "testsecret"
+        monkeypatch.setattr(main_mod, "_WEBHOOK_SECRET", secret)
+        body = json.dumps(
+            {
+                "type": "sandbox.lifecycle.killed",
+                "sandboxId": "abc",
+                "eventData": {"padding": "x" * (main_mod._WEBHOOK_INLINE_MAX_BYTES + 1)},
+            }
+        ).encode()
+        sig = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        good = client.post("/webhooks/e2b", content=body, headers={"e2b-signature": sig})
+        bad = client.post("/webhooks/e2b", content=body, headers={"e2b-signature": "00" * 32})
+        assert good.status_code == 200
+        assert bad.status_code == 401
+
 
 class TestAutoRegisterWebhook:
     def test_auto_register_skipped_without_config(self, monkeypatch):
@@ -71,3 +124,70 @@ class TestAutoRegisterWebhook:
         monkeypatch.delenv("E2B_API_KEY", raising=False)
         result = main_mod._auto_register_webhook()
         assert result is None
+
+    @pytest.mark.parametrize(
+        ("configured", "registered"),
+        [
+            ("https://example.com", "https://example.com/webhooks/e2b"),
+            ("https://example.com/", "https://example.com/webhooks/e2b"),
+            ("https://example.com/webhooks/e2b", "https://example.com/webhooks/e2b"),
+        ],
+    )
+    def test_auto_register_normalizes_url(self, monkeypatch, configured, registered):
+        calls = []
+        monkeypatch.setattr(main_mod, "load_sandstorm_config", lambda: {"webhook_url": configured})
+        monkeypatch.setenv("E2B_API_KEY", "e2b_test")
+        monkeypatch.setenv("SANDSTORM_WEBHOOK_SECRET", "s")
+        monkeypatch.setattr(
+            main_mod,
+            "webhook_request",
+            lambda method, path, api_key, data: calls.append(data) or {"id": "wh-1"},
+        )
+        assert main_mod._auto_register_webhook() == "wh-1"
+        assert calls[0]["url"] == registered
+
+    def test_lifespan_registers_in_background_and_deregisters(
+        self, monkeypatch, test_env_no_auth, mock_sandbox
+    ):
+        release = threading.Event()
+        deregistered: list[str | None] = []
+
+        def _slow_register():
+            release.wait(timeout=5)
+            return "wh-123"
+
+        monkeypatch.setattr(main_mod, "_auto_register_webhook", _slow_register)
+        monkeypatch.setattr(main_mod, "_auto_deregister_webhook", deregistered.append)
+
+        with TestClient(app) as lifespan_client:
+            # Startup completed while registration is still blocked
+            assert lifespan_client.get("/health").status_code == 200
+            release.set()
+
+        assert deregistered == ["wh-123"]
+
+    def test_lifespan_deregisters_registration_finishing_after_shutdown(
+        self, monkeypatch, test_env_no_auth, mock_sandbox
+    ):
+        shutting_down = threading.Event()
+        deregistered: list[str | None] = []
+
+        def _late_register():
+            # Only returns once shutdown has begun waiting on it
+            shutting_down.wait(timeout=5)
+            return "wh-late"
+
+        real_stop = main_mod.stop_warm_pool
+
+        async def _stop_and_release():
+            shutting_down.set()
+            await real_stop()
+
+        monkeypatch.setattr(main_mod, "_auto_register_webhook", _late_register)
+        monkeypatch.setattr(main_mod, "_auto_deregister_webhook", deregistered.append)
+        monkeypatch.setattr(main_mod, "stop_warm_pool", _stop_and_release)
+
+        with TestClient(app) as lifespan_client:
+            assert lifespan_client.get("/health").status_code == 200
+
+        assert deregistered == ["wh-late"]